@@ -0,0 +1,211 @@
+"""
+Whole-graph analytics for the degrees dataset.
+
+Connected components are found in one union-find pass over the movies.
+Separation distributions and eccentricities come from bit-parallel
+multi-source BFS: each person carries a 64-bit mask with one bit per
+source in the batch, so a single sweep over the graph advances 64
+searches by one level.
+"""
+
+import argparse
+import json
+import multiprocessing
+import random
+from array import array
+
+import snapshot
+
+# Sources advanced together by one bit-parallel search
+WORD = 64
+
+
+def find(parents, person):
+    """
+    Returns the root of a person's union-find set, halving the path.
+    """
+    while parents[person] != person:
+        parents[person] = parents[parents[person]]
+        person = parents[person]
+    return person
+
+
+def components(graph):
+    """
+    Returns the connected component sizes of the co-star graph, largest
+    first. People with no movies are components of size one.
+    """
+    graph.flush()
+    parents = array("i", range(len(graph.person_ids)))
+    for movie in range(len(graph.movie_ids)):
+        stars = graph.stars_for(movie)
+        if len(stars) < 2:
+            continue
+        root = find(parents, stars[0])
+        for star in stars[1:]:
+            other = find(parents, star)
+            if other != root:
+                parents[other] = root
+
+    sizes = {}
+    for person in range(len(parents)):
+        root = find(parents, person)
+        sizes[root] = sizes.get(root, 0) + 1
+    return sorted(sizes.values(), reverse=True)
+
+
+def multi_source_bfs(graph, sources):
+    """
+    Runs breadth-first search from up to 64 person indices at once.
+
+    Returns (histogram, eccentricities): histogram[d] counts the
+    (source, person) pairs at separation d, and eccentricities[i] is the
+    greatest separation from sources[i] to anyone it reaches.
+    """
+    graph.flush()
+    person_offsets = graph.person_offsets
+    person_movies = graph.person_movies
+    movie_offsets = graph.movie_offsets
+    movie_stars = graph.movie_stars
+
+    seen = [0] * len(graph.person_ids)
+    frontier = {}
+    for bit, source in enumerate(sources):
+        seen[source] |= 1 << bit
+        frontier[source] = frontier.get(source, 0) | 1 << bit
+
+    histogram = [len(sources)]
+    eccentricities = [0] * len(sources)
+    while frontier:
+        # Gather the bits arriving at each movie from the frontier
+        arriving = {}
+        for person, mask in frontier.items():
+            for k in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[k]
+                arriving[movie] = arriving.get(movie, 0) | mask
+
+        next_frontier = {}
+        for movie, mask in arriving.items():
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                star = movie_stars[j]
+                new = mask & ~seen[star]
+                if new:
+                    seen[star] |= new
+                    next_frontier[star] = next_frontier.get(star, 0) | new
+
+        if not next_frontier:
+            break
+        reached = 0
+        pairs = 0
+        for mask in next_frontier.values():
+            reached |= mask
+            pairs += mask.bit_count()
+        histogram.append(pairs)
+        for bit in range(len(sources)):
+            if reached >> bit & 1:
+                eccentricities[bit] = len(histogram) - 1
+        frontier = next_frontier
+    return histogram, eccentricities
+
+
+# Graph shared with forked workers
+shared_graph = None
+
+
+def run_batch(sources):
+    return multi_source_bfs(shared_graph, sources)
+
+
+def separation(graph, sources, workers=1):
+    """
+    Runs bit-parallel BFS from every source, 64 at a time, optionally
+    across a pool of forked worker processes.
+
+    Returns (histogram, eccentricities) merged over all batches, with
+    eccentricities mapping each source to its eccentricity.
+    """
+    global shared_graph
+    shared_graph = graph
+    batches = [sources[i:i + WORD] for i in range(0, len(sources), WORD)]
+
+    if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+        with multiprocessing.get_context("fork").Pool(workers) as pool:
+            results = pool.map(run_batch, batches, chunksize=1)
+    else:
+        results = [run_batch(batch) for batch in batches]
+
+    histogram = []
+    eccentricities = {}
+    for batch, (counts, batch_eccentricities) in zip(batches, results):
+        for distance, count in enumerate(counts):
+            if distance == len(histogram):
+                histogram.append(0)
+            histogram[distance] += count
+        eccentricities.update(zip(batch, batch_eccentricities))
+    return histogram, eccentricities
+
+
+def counts(values):
+    """
+    Returns a histogram of values as a dict sorted by value.
+    """
+    histogram = {}
+    for value in values:
+        histogram[value] = histogram.get(value, 0) + 1
+    return dict(sorted(histogram.items()))
+
+
+def print_histogram(title, histogram):
+    print(title)
+    total = sum(histogram.values()) or 1
+    for value, count in histogram.items():
+        bar = "#" * round(50 * count / total)
+        print(f"{value:>10} {count:>12} {bar}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Separation and component statistics for a dataset.")
+    parser.add_argument("directory")
+    parser.add_argument("--sources", type=int, default=WORD * 16,
+                        help="number of random BFS sources, or 0 for all")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes to spread source batches over")
+    parser.add_argument("--json", action="store_true",
+                        help="print the results as one JSON object")
+    args = parser.parse_args()
+
+    graph = snapshot.load_or_build(args.directory)
+    people = len(graph.person_ids)
+    if args.sources and args.sources < people:
+        sources = random.Random(args.seed).sample(range(people), args.sources)
+    else:
+        sources = list(range(people))
+
+    sizes = components(graph)
+    histogram, eccentricities = separation(graph, sources, args.workers)
+
+    results = {
+        "people": people,
+        "sources": len(sources),
+        "components": len(sizes),
+        "largest_component": sizes[0] if sizes else 0,
+        "component_sizes": counts(sizes),
+        "separation": dict(enumerate(histogram)),
+        "eccentricity": counts(eccentricities.values())
+    }
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    print(f"{people} people, {len(sizes)} components, "
+          f"largest has {results['largest_component']} people.")
+    print_histogram("Component sizes:", results["component_sizes"])
+    print_histogram(f"Degrees of separation from {len(sources)} sources:",
+                    results["separation"])
+    print_histogram("Eccentricities:", results["eccentricity"])
+
+
+if __name__ == "__main__":
+    main()
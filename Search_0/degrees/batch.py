@@ -0,0 +1,125 @@
+"""
+Answers many degrees queries at once.
+
+Pairs are read from a CSV file of source,target rows, each a person id
+or an unambiguous name. Pairs are grouped by source so each distinct
+source needs only one breadth-first search, and results are written to
+standard output as JSON lines in the order searches finish.
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import sys
+
+import degrees
+
+
+def resolve(value):
+    """
+    Returns the person_id for a person id or unambiguous name, or None.
+    """
+    if value in degrees.people:
+        return value
+    person_ids = degrees.names.get(value.lower(), set())
+    if len(person_ids) == 1:
+        return next(iter(person_ids))
+    return None
+
+
+def read_pairs(filename):
+    """
+    Returns the (source, target) rows of a pairs file, skipping an
+    optional source,target header.
+    """
+    with open(filename, encoding="utf-8", newline="") as f:
+        rows = [row for row in csv.reader(f) if len(row) == 2]
+    if rows and rows[0] == ["source", "target"]:
+        rows = rows[1:]
+    return [(source.strip(), target.strip()) for source, target in rows]
+
+
+def group_pairs(pairs):
+    """
+    Resolves pairs and groups them by source.
+
+    Returns (groups, errors): groups maps each source person_id to a list
+    of (source, target, target_id) tuples in input order, and errors
+    holds the pairs naming an unknown or ambiguous person.
+    """
+    groups = {}
+    errors = []
+    for source, target in pairs:
+        source_id = resolve(source)
+        target_id = resolve(target)
+        if source_id is None or target_id is None:
+            errors.append((source, target))
+        else:
+            groups.setdefault(source_id, []).append(
+                (source, target, target_id))
+    return groups, errors
+
+
+def answer(group):
+    """
+    Answers every query sharing one source with a single search and
+    returns the results as JSON lines.
+    """
+    source_id, queries = group
+    paths = degrees.shortest_paths_from(
+        source_id, [target_id for _, _, target_id in queries])
+
+    lines = []
+    for source, target, target_id in queries:
+        path = paths[target_id]
+        lines.append(json.dumps({
+            "source": source,
+            "target": target,
+            "degrees": None if path is None else len(path),
+            "path": path
+        }))
+    return lines
+
+
+def run(pairs, workers=1, output=sys.stdout):
+    """
+    Answers a list of (source, target) pairs, writing one JSON line per
+    pair to output. With several workers, distinct sources are searched
+    in a process pool that shares the loaded graph copy-on-write.
+    """
+    groups, errors = group_pairs(pairs)
+    for source, target in errors:
+        print(json.dumps({
+            "source": source,
+            "target": target,
+            "error": "Person not found."
+        }), file=output)
+
+    if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+        with context.Pool(workers) as pool:
+            for lines in pool.imap_unordered(answer, groups.items()):
+                print("\n".join(lines), file=output)
+    else:
+        for group in groups.items():
+            print("\n".join(answer(group)), file=output)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer degrees queries from a CSV of pairs.")
+    parser.add_argument("directory")
+    parser.add_argument("pairs", help="CSV file of source,target rows")
+    parser.add_argument("--compact", action="store_true",
+                        help="load the compact graph (and its snapshot)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes to spread distinct sources over")
+    args = parser.parse_args()
+
+    degrees.load_data(args.directory, compact=args.compact)
+    run(read_pairs(args.pairs), workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
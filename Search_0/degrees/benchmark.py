@@ -0,0 +1,157 @@
+"""
+Benchmarks loading and querying a degrees dataset.
+
+Each load mode runs in its own forked process, so its memory use and
+timings are not affected by the others. For every mode the suite
+records load time, peak resident memory added by the load and
+shortest path latency percentiles over random pairs of people, and
+prints the results as JSON for regression tracking.
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import resource
+import sys
+import time
+
+import degrees
+import snapshot
+
+MODES = ("dict", "compact", "snapshot")
+SEARCHES = {
+    "shortest_path": degrees.shortest_path,
+    "bidirectional": degrees.bidirectional_shortest_path
+}
+
+
+def max_rss():
+    """
+    Returns the peak resident memory of this process in bytes.
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def percentiles(samples):
+    """
+    Returns summary statistics of a list of latencies in milliseconds.
+    """
+    samples = sorted(samples)
+    if not samples:
+        return {}
+
+    def at(fraction):
+        index = min(len(samples) - 1, int(fraction * len(samples)))
+        return round(samples[index] * 1000, 3)
+
+    return {
+        "count": len(samples),
+        "mean": round(sum(samples) / len(samples) * 1000, 3),
+        "p50": at(0.5),
+        "p90": at(0.9),
+        "p99": at(0.99),
+        "max": at(1.0)
+    }
+
+
+def warm_snapshot(directory):
+    """
+    Builds the dataset's snapshot if it is missing or stale. Returns None
+    so the graph is not sent back to the parent process.
+    """
+    snapshot.load_or_build(directory)
+
+
+def run_mode(directory, mode, pairs, seed):
+    """
+    Loads the dataset in one mode and times queries against it.
+    """
+    before = max_rss()
+    start = time.perf_counter()
+    degrees.load_data(directory, compact=mode != "dict",
+                      cache=mode == "snapshot")
+    load_seconds = time.perf_counter() - start
+    memory = max_rss() - before
+
+    rng = random.Random(seed)
+    people = sorted(degrees.people)
+    queries = [(rng.choice(people), rng.choice(people)) for _ in range(pairs)]
+
+    results = {}
+    for name, search in SEARCHES.items():
+        latencies = []
+        expanded = 0
+        connected = 0
+        for source, target in queries:
+            start = time.perf_counter()
+            path = search(source, target)
+            latencies.append(time.perf_counter() - start)
+            expanded += degrees.search_stats["expanded"]
+            connected += path is not None
+        results[name] = percentiles(latencies)
+        results[name]["connected"] = connected
+        results[name]["mean_expanded"] = expanded / max(1, len(queries))
+
+    return {
+        "load_seconds": round(load_seconds, 3),
+        "memory_bytes": memory,
+        "queries": results
+    }
+
+
+def run(directory, modes=MODES, pairs=100, seed=0):
+    """
+    Runs every mode in a fresh process and returns the combined report.
+    """
+    context = multiprocessing.get_context(
+        "fork" if "fork" in multiprocessing.get_all_start_methods()
+        else "spawn")
+
+    # Make sure the snapshot exists so its mode measures a warm start
+    if "snapshot" in modes:
+        with context.Pool(1) as pool:
+            pool.apply(warm_snapshot, (directory,))
+
+    report = {
+        "directory": directory,
+        "python": platform.python_version(),
+        "pairs": pairs,
+        "seed": seed,
+        "modes": {}
+    }
+    for mode in modes:
+        with context.Pool(1) as pool:
+            report["modes"][mode] = pool.apply(
+                run_mode, (directory, mode, pairs, seed))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark loading and querying a degrees dataset.")
+    parser.add_argument("directory")
+    parser.add_argument("--modes", default=",".join(MODES),
+                        help=f"comma-separated subset of {','.join(MODES)}")
+    parser.add_argument("--pairs", type=int, default=100,
+                        help="random pairs to query per mode")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report to a file")
+    args = parser.parse_args()
+
+    modes = args.modes.split(",")
+    if not set(modes) <= set(MODES):
+        sys.exit(f"Unknown mode in {args.modes}.")
+
+    report = run(args.directory, modes, args.pairs, args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
 import csv
 import sys
+import time
+from collections import deque
 
-from util import Node, StackFrontier, QueueFrontier
+import snapshot
+from graph import CompactGraph, MoviesView, NamesView, PeopleView
+from util import STRATEGIES, a_star_search
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,54 +16,137 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact CSR store backing the three maps above, when loaded with compact=True
+graph = None
 
-def load_data(directory):
+# Compiled movie filters, keyed by (min_year, max_year, excluded)
+movie_masks = {}
+
+# Counters from the most recent search, used to compare search strategies
+search_stats = {"expanded": 0, "peak_frontier": 0, "seconds": 0.0}
+
+
+def load_data(directory, compact=False, cache=True):
     """
     Load data from CSV files into memory.
+
+    With compact=True the data is held in an integer-indexed CSR graph
+    and names, people and movies become read-only views over it. The
+    graph is then read from a snapshot next to the CSV files when one
+    is current, and a snapshot is written otherwise, unless cache=False.
     """
+    global graph, names, people, movies
+    movie_masks.clear()
+    if compact:
+        if cache:
+            graph = snapshot.load_or_build(directory)
+        else:
+            graph = CompactGraph.from_csv(directory)
+        names = NamesView(graph)
+        people = PeopleView(graph)
+        movies = MoviesView(graph)
+        return
+    if graph is not None:
+        graph = None
+        names, people, movies = {}, {}, {}
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
+            add_person(row["id"], row["name"], row["birth"])
 
     # Load movies
     with open(f"{directory}/movies.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
+            add_movie(row["id"], row["title"], row["year"])
 
     # Load stars
     with open(f"{directory}/stars.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+            add_star(row["person_id"], row["movie_id"])
+
+
+def add_person(person_id, name, birth):
+    """
+    Adds a person to the loaded data. Re-adding a known person updates
+    their name and birth but keeps their movies.
+    """
+    if graph is not None:
+        graph.add_person(person_id, name, birth)
+        return
+
+    previous = people.get(person_id)
+    if previous is not None:
+        old_name = previous["name"].lower()
+        names[old_name].discard(person_id)
+        if not names[old_name]:
+            del names[old_name]
+    people[person_id] = {
+        "name": name,
+        "birth": birth,
+        "movies": set() if previous is None else previous["movies"]
+    }
+    if name.lower() not in names:
+        names[name.lower()] = {person_id}
+    else:
+        names[name.lower()].add(person_id)
+
+
+def add_movie(movie_id, title, year):
+    """
+    Adds a movie to the loaded data. Re-adding a known movie updates
+    its title and year but keeps its stars.
+    """
+    movie_masks.clear()
+    if graph is not None:
+        graph.add_movie(movie_id, title, year)
+        return
+
+    previous = movies.get(movie_id)
+    movies[movie_id] = {
+        "title": title,
+        "year": year,
+        "stars": set() if previous is None else previous["stars"]
+    }
+
+
+def add_star(person_id, movie_id):
+    """
+    Records that a person starred in a movie. Rows naming an unknown
+    person or movie are ignored.
+    """
+    if graph is not None:
+        person = graph.person_index.get(person_id)
+        movie = graph.movie_index.get(movie_id)
+        if person is not None and movie is not None:
+            graph.add_star(person, movie)
+        return
+
+    if person_id in people and movie_id in movies:
+        people[person_id]["movies"].add(movie_id)
+        movies[movie_id]["stars"].add(person_id)
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    flags = {arg for arg in sys.argv[1:] if arg.startswith("--")}
+    strategy = "bidirectional" if "--bidirectional" in flags else None
+    for flag in flags:
+        if flag.startswith("--strategy="):
+            strategy = flag.split("=", 1)[1]
+    if (len(args) > 1 or strategy not in {None, *STRATEGIES} or not all(
+            flag in {"--bidirectional", "--compact"}
+            or flag.startswith("--strategy=") for flag in flags)):
+        sys.exit("Usage: python degrees.py [--bidirectional] [--compact] "
+                 f"[--strategy={{{','.join(STRATEGIES)}}}] [directory]")
+    directory = args[0] if len(args) == 1 else "large"
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(directory, compact="--compact" in flags)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -69,7 +156,10 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if strategy is None:
+        path = shortest_path(source, target)
+    else:
+        path = search(source, target, strategy)
 
     if path is None:
         print("Not connected.")
@@ -84,65 +174,309 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, min_year=None, max_year=None, exclude=()):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    Only movies from min_year to max_year, and not named by id or title
+    in exclude, are followed when those filters are given.
+
     If no possible path, returns None.
     """
+    mask = movie_mask(min_year, max_year, exclude)
+    if graph is not None:
+        began = time.perf_counter()
+        path, expanded = graph.shortest_path(
+            graph.person_index[source], graph.person_index[target], mask)
+        search_stats.update(expanded=expanded, peak_frontier=None,
+                            seconds=time.perf_counter() - began)
+        if path is None:
+            return None
+        return [(graph.movie_ids[movie], graph.person_ids[person])
+                for movie, person in path]
+
+    return search(source, target, "bfs", mask)
+
+
+def search(source, target, strategy="bfs", mask=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target using one of the search
+    strategies in util.STRATEGIES, or None if there is no path.
+    Counters from the search are left in search_stats.
+    """
+    def neighbors(person_id):
+        return neighbors_for_person(person_id, mask)
 
-    start = Node(state=source, parent=None, action=None)
-    frontier = QueueFrontier()
-    frontier.add(start)
+    if strategy == "astar":
+        result = a_star_search(source, target, neighbors, lambda state: 0)
+    else:
+        result = STRATEGIES[strategy](source, target, neighbors)
+    search_stats.update(expanded=result.expanded,
+                        peak_frontier=result.peak_frontier,
+                        seconds=result.seconds)
+    return result.path
 
-    explored = set()
 
-    while True:
-        if frontier.empty():
-            raise Exception("No Solution")
+def shortest_paths_from(source, targets):
+    """
+    Runs a single breadth-first search from the source and returns a
+    dict mapping each target to the shortest list of (movie_id, person_id)
+    pairs reaching it, or to None if it is not connected.
+    """
+    if graph is not None:
+        paths = graph.shortest_paths_from(
+            graph.person_index[source],
+            [graph.person_index[target] for target in targets])
+        return {
+            graph.person_ids[target]: None if path is None else [
+                (graph.movie_ids[movie], graph.person_ids[person])
+                for movie, person in path]
+            for target, path in paths.items()
+        }
+
+    # Maps each reached person_id to the (movie_id, person_id) step
+    # that first reached them
+    parents = {source: None}
+    remaining = set(targets) - {source}
+    frontier = deque([source])
+    while frontier and remaining:
+        person_id = frontier.popleft()
+        for movie_id, neighbor in neighbors_for_person(person_id):
+            if neighbor not in parents:
+                parents[neighbor] = (movie_id, person_id)
+                remaining.discard(neighbor)
+                frontier.append(neighbor)
+
+    paths = {}
+    for target in targets:
+        if target not in parents:
+            paths[target] = None
+            continue
+        path = []
+        person_id = target
+        while parents[person_id] is not None:
+            movie_id, parent = parents[person_id]
+            path.append((movie_id, person_id))
+            person_id = parent
+        path.reverse()
+        paths[target] = path
+    return paths
+
+
+def shortest_path_dag(source, target):
+    """
+    Runs breadth-first search from the source one layer at a time and
+    records every (movie_id, person_id) step from each layer to the next,
+    stopping once the target's layer is complete.
 
-        node = frontier.remove()
+    Returns a dict mapping each person_id on a shortest path to the
+    target to the list of (movie_id, parent_id) steps reaching it from
+    the previous layer, or None if the people are not connected.
+    """
+    # Maps each reached person_id to its layer
+    depth = {source: 0}
+    parents = {source: []}
+    layer = [source]
+    while target not in depth:
+        if not layer:
+            return None
+        next_layer = []
+        for person_id in layer:
+            for movie_id, neighbor in neighbors_for_person(person_id):
+                if neighbor not in depth:
+                    depth[neighbor] = depth[person_id] + 1
+                    parents[neighbor] = []
+                    next_layer.append(neighbor)
+                if depth[neighbor] == depth[person_id] + 1:
+                    parents[neighbor].append((movie_id, person_id))
+        layer = next_layer
+
+    # Keep only the people with a shortest path on to the target
+    dag = {}
+    stack = [target]
+    while stack:
+        person_id = stack.pop()
+        if person_id in dag:
+            continue
+        dag[person_id] = parents[person_id]
+        stack.extend(parent for _, parent in parents[person_id])
+    return dag
+
+
+def count_shortest_paths(source, target, dag=None):
+    """
+    Returns the number of distinct shortest lists of (movie_id, person_id)
+    pairs connecting the source to the target, without enumerating them.
+    """
+    if dag is None:
+        dag = shortest_path_dag(source, target)
+    if dag is None:
+        return 0
 
-        if node.state == target:
-            actions = []
-            cells = []
-            while node.parent is not None:
-                actions.append(node.action)
-                cells.append(node.state)
-                node = node.parent
-            actions.reverse()
-            cells.reverse()
+    # Paths from the source to each person, filled in layer order
+    counts = {source: 1}
+    for person_id in layer_order(dag, source):
+        if person_id != source:
+            counts[person_id] = sum(
+                counts[parent] for _, parent in dag[person_id])
+    return counts[target]
 
-            solution = []
 
-            for i in range(len(actions)):
-                solution.append(tuple([actions[i], cells[i]]))
-            return solution
+def layer_order(dag, source):
+    """
+    Returns the people in a shortest path DAG ordered by their distance
+    from the source.
+    """
+    children = {}
+    for person_id, steps in dag.items():
+        for _, parent in steps:
+            children.setdefault(parent, set()).add(person_id)
+    # A person with several parents is listed once, when first reached
+    order = [source]
+    seen = {source}
+    for person_id in order:
+        for child in children.pop(person_id, ()):
+            if child not in seen:
+                seen.add(child)
+                order.append(child)
+    return order
+
+
+def all_shortest_paths(source, target, dag=None):
+    """
+    Lazily yields every shortest list of (movie_id, person_id) pairs
+    connecting the source to the target. Only the path being built is
+    held in memory, however many paths there are.
+    """
+    if dag is None:
+        dag = shortest_path_dag(source, target)
+    if dag is None:
+        return
+    if source == target:
+        yield []
+        return
+
+    # Walk back from the target, one iterator over parent steps per level
+    path = []
+    stack = [iter(dag[target])]
+    people_on_path = [target]
+    while stack:
+        step = next(stack[-1], None)
+        if step is None:
+            stack.pop()
+            people_on_path.pop()
+            if path:
+                path.pop()
+            continue
+        movie_id, parent = step
+        path.append((movie_id, people_on_path[-1]))
+        if parent == source:
+            yield path[::-1]
+            path.pop()
+            continue
+        people_on_path.append(parent)
+        stack.append(iter(dag[parent]))
+
+
+def movie_year(movie_id):
+    """
+    Returns a movie's year as an int, or 0 if it is unknown.
+    """
+    if graph is not None:
+        year = graph.movie_years[graph.movie_index[movie_id]]
+    else:
+        year = movies[movie_id]["year"]
+    try:
+        return int(year)
+    except ValueError:
+        return 0
 
-        explored.add(node.state)
 
-        for action, state in neighbors_for_person(node.state):
-            if not frontier.contains_state(state) and state not in explored:
-                child = Node(state=state, parent=node, action=action)
+def movie_mask(min_year=None, max_year=None, exclude=()):
+    """
+    Compiles movie filters into a mask, or returns None if there are no
+    filters. The mask is a bytearray over movie indices in compact mode
+    and a frozenset of allowed movie_ids otherwise. Masks are cached
+    until the data changes.
+    """
+    if min_year is None and max_year is None and not exclude:
+        return None
+    excluded = frozenset(str(item).lower() for item in exclude)
+    key = (min_year, max_year, excluded)
+    if key in movie_masks:
+        return movie_masks[key]
+
+    def allowed(movie_id, title, year):
+        if movie_id.lower() in excluded or title.lower() in excluded:
+            return False
+        if min_year is None and max_year is None:
+            return True
+        try:
+            year = int(year)
+        except ValueError:
+            return False
+        return ((min_year is None or year >= min_year)
+                and (max_year is None or year <= max_year))
+
+    if graph is not None:
+        mask = bytearray(
+            allowed(movie_id, title, year) for movie_id, title, year in zip(
+                graph.movie_ids, graph.movie_titles, graph.movie_years))
+    else:
+        mask = frozenset(
+            movie_id for movie_id, movie in movies.items()
+            if allowed(movie_id, movie["title"], movie["year"]))
+    movie_masks[key] = mask
+    return mask
 
-                if child.state == target:
-                    actions = []
-                    cells = []
-                    while child.parent is not None:
-                        actions.append(child.action)
-                        cells.append(child.state)
-                        child = child.parent
-                    actions.reverse()
-                    cells.reverse()
 
-                    solution = []
+def top_shortest_paths(source, target, k, newest=True, dag=None):
+    """
+    Returns up to k shortest lists of (movie_id, person_id) pairs
+    connecting the source to the target, ranked by the average year of
+    their movies, newest first (or oldest first with newest=False).
+    """
+    if dag is None:
+        dag = shortest_path_dag(source, target)
+    if dag is None:
+        return []
+    if source == target:
+        return [[]]
+    sign = 1 if newest else -1
+
+    # Best k (score, path) pairs from the source to each person, built in
+    # layer order; every path to a person has the same length, so the
+    # total of its years ranks it like the average would
+    best = {source: [(0, [])]}
+    for person_id in layer_order(dag, source):
+        if person_id == source:
+            continue
+        candidates = []
+        for movie_id, parent in dag[person_id]:
+            year = sign * movie_year(movie_id)
+            for score, path in best[parent]:
+                candidates.append(
+                    (score + year, path + [(movie_id, person_id)]))
+        candidates.sort(key=lambda candidate: -candidate[0])
+        best[person_id] = candidates[:k]
+    return [path for _, path in best[target]]
+
+
+def bidirectional_shortest_path(source, target, min_year=None, max_year=None,
+                                exclude=()):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching breadth-first
+    from both ends and always expanding the smaller frontier.
 
-                    for i in range(len(actions)):
-                        solution.append(tuple([actions[i], cells[i]]))
-                    return solution
+    Movies can be filtered as in shortest_path.
 
-                frontier.add(child)
+    If no possible path, returns None.
+    """
+    mask = movie_mask(min_year, max_year, exclude)
+    return search(source, target, "bidirectional", mask)
 
 
 def person_id_for_name(name):
@@ -171,14 +505,19 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
-def neighbors_for_person(person_id):
+def neighbors_for_person(person_id, mask=None):
     """
     Returns (movie_id, person_id) pairs for people
-    who starred with a given person.
+    who starred with a given person, through movies allowed by the
+    optional mask from movie_mask.
     """
+    if graph is not None:
+        return graph.neighbors_for_person(person_id, mask)
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
+        if mask is not None and movie_id not in mask:
+            continue
         for person_id in movies[movie_id]["stars"]:
             neighbors.add((movie_id, person_id))
     return neighbors
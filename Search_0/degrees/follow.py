@@ -0,0 +1,111 @@
+"""
+Follows a degrees dataset as rows are appended to its CSV files.
+
+The data is loaded once, then each CSV is polled for complete new lines,
+which are applied with degrees.add_person, add_movie and add_star rather
+than reloading. People and movies are applied before stars on every poll
+so new stars can refer to them. In compact mode the snapshot is
+rewritten after each batch of updates.
+"""
+
+import argparse
+import csv
+import os
+import time
+
+import degrees
+import snapshot
+
+
+class CsvTail():
+    """
+    Reads rows appended to a CSV file since the last read.
+    """
+
+    def __init__(self, path, offset):
+        self.path = path
+        self.offset = offset
+        with open(path, encoding="utf-8", newline="") as f:
+            self.fieldnames = next(csv.reader(f))
+
+    def read(self):
+        """
+        Returns the complete rows appended since the last read, as dicts.
+        A trailing partial line is left for the next read.
+        """
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return []
+        self.offset += end
+        lines = data[:end].decode("utf-8").splitlines()
+        return list(csv.DictReader(lines, fieldnames=self.fieldnames))
+
+    def caught_up(self):
+        """
+        Returns whether every byte in the file has been read.
+        """
+        return os.path.getsize(self.path) == self.offset
+
+
+def apply_rows(people_rows=(), movie_rows=(), star_rows=()):
+    """
+    Applies appended people, movie and star rows to the loaded data.
+    Returns the number of rows applied.
+    """
+    for row in people_rows:
+        degrees.add_person(row["id"], row["name"], row["birth"])
+    for row in movie_rows:
+        degrees.add_movie(row["id"], row["title"], row["year"])
+    for row in star_rows:
+        degrees.add_star(row["person_id"], row["movie_id"])
+    return len(people_rows) + len(movie_rows) + len(star_rows)
+
+
+def follow(directory, compact=False, interval=1.0):
+    """
+    Loads a dataset, then applies rows appended to its CSV files until
+    interrupted.
+    """
+    tails = {}
+    for filename in snapshot.SOURCES:
+        path = os.path.join(directory, filename)
+        tails[filename] = CsvTail(path, os.path.getsize(path))
+
+    degrees.load_data(directory, compact=compact)
+    print(f"Following {directory}...")
+
+    while True:
+        applied = apply_rows(
+            tails["people.csv"].read(),
+            tails["movies.csv"].read(),
+            tails["stars.csv"].read())
+        if applied:
+            print(f"Applied {applied} rows.")
+            if degrees.graph is not None and all(
+                    tail.caught_up() for tail in tails.values()):
+                snapshot.save(degrees.graph, directory)
+        time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Apply rows appended to a degrees dataset's CSVs.")
+    parser.add_argument("directory")
+    parser.add_argument("--compact", action="store_true",
+                        help="load the compact graph and keep its snapshot "
+                             "up to date")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="seconds between polls")
+    args = parser.parse_args()
+
+    try:
+        follow(args.directory, args.compact, args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Compares the deque-backed frontiers in util.py with the original
+list-backed ones, which sliced the list on every remove and scanned it
+on every contains_state.
+"""
+
+import sys
+import time
+
+from util import Node, StackFrontier, QueueFrontier
+
+# The list-backed versions get slow quadratically, so they are only
+# timed up to this many nodes
+LIST_LIMIT = 10 ** 5
+
+# Number of contains_state lookups timed per run
+LOOKUPS = 1000
+
+
+class ListStackFrontier():
+    def __init__(self):
+        self.frontier = []
+
+    def add(self, node):
+        self.frontier.append(node)
+
+    def contains_state(self, state):
+        return any(node.state == state for node in self.frontier)
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier[-1]
+            self.frontier = self.frontier[:-1]
+            return node
+
+
+class ListQueueFrontier(ListStackFrontier):
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier[0]
+            self.frontier = self.frontier[1:]
+            return node
+
+
+def run(frontier_class, size):
+    """
+    Fills a frontier with size nodes, probes it, then drains it.
+    Returns the seconds spent in add, contains_state and remove.
+    """
+    frontier = frontier_class()
+    nodes = [Node(state=i, parent=None, action=None) for i in range(size)]
+
+    start = time.perf_counter()
+    for node in nodes:
+        frontier.add(node)
+    added = time.perf_counter()
+    for i in range(LOOKUPS):
+        frontier.contains_state(size - 1 - i * size // LOOKUPS)
+    probed = time.perf_counter()
+    while not frontier.empty():
+        frontier.remove()
+    drained = time.perf_counter()
+    return added - start, probed - added, drained - probed
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10 ** 5, 10 ** 6]
+
+    print(f"{'frontier':<18}{'nodes':>10}{'add':>10}"
+          f"{'contains':>10}{'remove':>10}")
+    for size in sizes:
+        for frontier_class in (ListStackFrontier, StackFrontier,
+                               ListQueueFrontier, QueueFrontier):
+            name = frontier_class.__name__
+            if frontier_class.__module__ == __name__ and size > LIST_LIMIT:
+                print(f"{name:<18}{size:>10}{'skipped (quadratic)':>30}")
+                continue
+            add, contains, remove = run(frontier_class, size)
+            print(f"{name:<18}{size:>10}{add:>10.3f}"
+                  f"{contains:>10.3f}{remove:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Generates a synthetic IMDB-like dataset for degrees.py.
+
+Cast sizes follow a Pareto distribution and actors are picked with
+Zipf-like popularity, so a few prolific actors appear in many movies
+while most appear in one or two, as in the real data. Names are drawn
+from small word lists, so some people share a name.
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import random
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael",
+    "Linda", "William", "Elizabeth", "David", "Barbara", "Richard", "Susan",
+    "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen", "Daniel",
+    "Nancy", "Matthew", "Lisa", "Anthony", "Betty", "Mark", "Margaret",
+    "Donald", "Sandra", "Steven", "Ashley", "Paul", "Kimberly", "Andrew",
+    "Emily", "Joshua", "Donna", "Kenneth", "Michelle", "Kevin", "Carol",
+    "Brian", "Amanda", "George", "Melissa", "Timothy", "Deborah", "Ronald",
+    "Stephanie", "Edward", "Rebecca", "Jason", "Sharon", "Jeffrey", "Laura"
+]
+
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller",
+    "Davis", "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez",
+    "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark",
+    "Ramirez", "Lewis", "Robinson", "Walker", "Young", "Allen", "King",
+    "Wright", "Scott", "Torres", "Nguyen", "Hill", "Flores", "Green",
+    "Adams", "Nelson", "Baker", "Hall", "Rivera", "Campbell", "Mitchell",
+    "Carter", "Roberts", "Gomez", "Phillips", "Evans", "Turner", "Diaz"
+]
+
+TITLE_WORDS = [
+    "Night", "Return", "Dark", "Love", "City", "Last", "Secret", "Lost",
+    "Blood", "Star", "House", "Day", "Man", "Girl", "War", "King", "Dream",
+    "River", "Shadow", "Fire", "Heart", "Road", "Storm", "Island", "Ghost",
+    "Summer", "Winter", "Game", "Street", "Kingdom", "Edge", "Silence"
+]
+
+
+def cast_size(rng, alpha, largest):
+    """
+    Returns a Pareto-distributed number of stars for one movie.
+    """
+    return min(largest, int(rng.paretovariate(alpha)))
+
+
+def generate(directory, people, movies=None, alpha=1.3, zipf=0.8,
+             newcomers=0.6, largest=60, seed=None):
+    """
+    Writes people.csv, movies.csv and stars.csv into directory.
+    A newcomers fraction of cast slots ignores popularity and picks
+    anyone, so most people appear somewhere. Returns the number of star
+    rows written.
+    """
+    rng = random.Random(seed)
+    if movies is None:
+        movies = max(1, people // 2)
+    os.makedirs(directory, exist_ok=True)
+
+    # Person ids are shuffled so popularity does not follow id order
+    ids = list(range(1, people + 1))
+    rng.shuffle(ids)
+
+    with open(os.path.join(directory, "people.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        f.write("id,name,birth\n")
+        writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        for person_id in range(1, people + 1):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            if rng.random() < 0.3:
+                name += f" {rng.choice(LAST_NAMES)}"
+            birth = rng.randint(1900, 2010) if rng.random() < 0.8 else ""
+            writer.writerow([person_id, name, birth])
+
+    # Rank r is chosen with weight 1 / r ** zipf
+    weights = itertools.accumulate(
+        1 / rank ** zipf for rank in range(1, people + 1))
+    cumulative = list(weights)
+
+    stars = 0
+    with open(os.path.join(directory, "movies.csv"), "w",
+              encoding="utf-8", newline="") as movies_file, \
+            open(os.path.join(directory, "stars.csv"), "w",
+                 encoding="utf-8", newline="") as stars_file:
+        movies_file.write("id,title,year\n")
+        stars_file.write("person_id,movie_id\n")
+        movie_writer = csv.writer(movies_file, quoting=csv.QUOTE_NONNUMERIC)
+        star_writer = csv.writer(stars_file)
+        for movie_id in range(1, movies + 1):
+            words = rng.sample(TITLE_WORDS, rng.randint(1, 3))
+            title = " ".join(["The"] * (rng.random() < 0.3) + words)
+            movie_writer.writerow([movie_id, title, rng.randint(1920, 2024)])
+
+            size = min(people, cast_size(rng, alpha, largest))
+            cast = set()
+            for rank in rng.choices(
+                    range(people), cum_weights=cumulative, k=size):
+                if rng.random() < newcomers:
+                    rank = rng.randrange(people)
+                cast.add(ids[rank])
+            for person_id in cast:
+                star_writer.writerow([person_id, movie_id])
+            stars += len(cast)
+    return stars
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic degrees dataset.")
+    parser.add_argument("directory")
+    parser.add_argument("--people", type=int, default=10 ** 4)
+    parser.add_argument("--movies", type=int, default=None,
+                        help="defaults to half the number of people")
+    parser.add_argument("--alpha", type=float, default=1.3,
+                        help="Pareto shape of cast sizes")
+    parser.add_argument("--zipf", type=float, default=0.8,
+                        help="Zipf exponent of actor popularity")
+    parser.add_argument("--newcomers", type=float, default=0.6,
+                        help="fraction of cast slots picked uniformly")
+    parser.add_argument("--largest", type=int, default=60,
+                        help="largest cast size")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    stars = generate(args.directory, args.people, args.movies, args.alpha,
+                     args.zipf, args.newcomers, args.largest, args.seed)
+    movies = args.movies or max(1, args.people // 2)
+    print(f"Wrote {args.people} people, {movies} movies and {stars} stars "
+          f"to {args.directory}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,550 @@
+"""
+Compact integer-indexed graph for the degrees dataset.
+
+People and movies are interned to dense ints and the person -> movies
+and movie -> stars relations are stored in compressed sparse row form:
+an offsets array per side plus one flat array of neighbor indices.
+"""
+
+import csv
+import sys
+from array import array
+from collections import deque
+from collections.abc import Mapping
+
+
+def zeros(length):
+    """
+    Returns an int array of the given length filled with zeros.
+    """
+    return array("i", bytes(4 * length))
+
+
+def build_csr(sources, targets, size):
+    """
+    Groups parallel source/target index arrays into CSR form.
+    Returns (offsets, neighbors) where the neighbors of source i are
+    neighbors[offsets[i]:offsets[i + 1]].
+    """
+    offsets = zeros(size + 1)
+    for source in sources:
+        offsets[source + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+
+    cursor = array("i", offsets)
+    neighbors = zeros(len(sources))
+    for source, target in zip(sources, targets):
+        neighbors[cursor[source]] = target
+        cursor[source] += 1
+    return offsets, neighbors
+
+
+def merge_csr(offsets, neighbors, sources, targets, size):
+    """
+    Returns CSR arrays for size sources holding the existing relation
+    plus the extra edges in the parallel sources/targets arrays.
+    """
+    old_size = len(offsets) - 1
+    merged_offsets = zeros(size + 1)
+    for i in range(old_size):
+        merged_offsets[i + 1] = offsets[i + 1] - offsets[i]
+    for source in sources:
+        merged_offsets[source + 1] += 1
+    for i in range(size):
+        merged_offsets[i + 1] += merged_offsets[i]
+
+    merged = zeros(len(neighbors) + len(sources))
+    cursor = array("i", merged_offsets)
+    for i in range(old_size):
+        start = offsets[i]
+        end = offsets[i + 1]
+        if start != end:
+            merged[cursor[i]:cursor[i] + end - start] = array(
+                "i", neighbors[start:end])
+            cursor[i] += end - start
+    for source, target in zip(sources, targets):
+        merged[cursor[source]] = target
+        cursor[source] += 1
+    return merged_offsets, merged
+
+
+def trace(parent_person, parent_movie, source, person):
+    """
+    Follows BFS parent arrays from a person back to the source and
+    returns the path as a list of (movie, person) index pairs.
+    """
+    path = []
+    while person != source:
+        path.append((parent_movie[person], person))
+        person = parent_person[person]
+    path.reverse()
+    return path
+
+
+class CompactGraph():
+    """
+    Person/movie bipartite graph with string ids interned to ints.
+    """
+
+    def __init__(self):
+        self.person_ids = []
+        self.person_names = []
+        self.person_births = []
+        self.person_index = {}
+
+        self.movie_ids = []
+        self.movie_titles = []
+        self.movie_years = []
+        self.movie_index = {}
+
+        # Maps lowercase names to a person index, or a tuple of indices
+        # when several people share the name
+        self.name_index = {}
+
+        self.person_offsets = zeros(1)
+        self.person_movies = zeros(0)
+        self.movie_offsets = zeros(1)
+        self.movie_stars = zeros(0)
+
+        # Stars added since the CSR arrays were last built
+        self.pending_people = array("i")
+        self.pending_movies = array("i")
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Builds a graph straight from the dataset CSV files.
+        """
+        graph = cls()
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                graph.add_person(row["id"], row["name"], row["birth"])
+
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                graph.add_movie(row["id"], row["title"], row["year"])
+
+        star_people = array("i")
+        star_movies = array("i")
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    person = graph.person_index[row["person_id"]]
+                    movie = graph.movie_index[row["movie_id"]]
+                except KeyError:
+                    continue
+                star_people.append(person)
+                star_movies.append(movie)
+
+        graph.build(star_people, star_movies)
+        return graph
+
+    @classmethod
+    def from_dicts(cls, people, movies):
+        """
+        Builds a graph from the dict-of-dicts layout used by degrees.py.
+        """
+        graph = cls()
+        for person_id, person in people.items():
+            graph.add_person(person_id, person["name"], person["birth"])
+        for movie_id, movie in movies.items():
+            graph.add_movie(movie_id, movie["title"], movie["year"])
+
+        star_people = array("i")
+        star_movies = array("i")
+        for person_id, person in people.items():
+            index = graph.person_index[person_id]
+            for movie_id in person["movies"]:
+                star_people.append(index)
+                star_movies.append(graph.movie_index[movie_id])
+
+        graph.build(star_people, star_movies)
+        return graph
+
+    def add_person(self, person_id, name, birth):
+        """
+        Interns a person and returns their index. Re-adding a known
+        person updates their name and birth but keeps their movies.
+        """
+        person = self.person_index.get(person_id)
+        if person is not None:
+            self.unindex_name(self.person_names[person], person)
+            self.person_names[person] = name
+            self.person_births[person] = birth
+        else:
+            person = len(self.person_ids)
+            self.person_ids.append(person_id)
+            self.person_names.append(name)
+            self.person_births.append(birth)
+            self.person_index[person_id] = person
+        self.index_name(name, person)
+        return person
+
+    def index_name(self, name, person):
+        """
+        Adds a person index to the name index under their name.
+        """
+        key = name.lower()
+        existing = self.name_index.get(key)
+        if existing is None:
+            self.name_index[key] = person
+        elif isinstance(existing, tuple):
+            self.name_index[key] = existing + (person,)
+        else:
+            self.name_index[key] = (existing, person)
+
+    def unindex_name(self, name, person):
+        """
+        Removes a person index from the name index entry for their name.
+        """
+        key = name.lower()
+        existing = self.name_index[key]
+        if not isinstance(existing, tuple):
+            del self.name_index[key]
+            return
+        remaining = tuple(other for other in existing if other != person)
+        self.name_index[key] = \
+            remaining[0] if len(remaining) == 1 else remaining
+
+    def add_movie(self, movie_id, title, year):
+        """
+        Interns a movie and returns its index. Re-adding a known movie
+        updates its title and year but keeps its stars.
+        """
+        movie = self.movie_index.get(movie_id)
+        if movie is not None:
+            self.movie_titles[movie] = title
+            self.movie_years[movie] = year
+            return movie
+        movie = len(self.movie_ids)
+        self.movie_ids.append(movie_id)
+        self.movie_titles.append(title)
+        self.movie_years.append(year)
+        self.movie_index[movie_id] = movie
+        return movie
+
+    def build(self, star_people, star_movies):
+        """
+        Builds both CSR relations from parallel star index arrays.
+        """
+        self.person_offsets, self.person_movies = build_csr(
+            star_people, star_movies, len(self.person_ids))
+        self.movie_offsets, self.movie_stars = build_csr(
+            star_movies, star_people, len(self.movie_ids))
+
+    def add_star(self, person, movie):
+        """
+        Records that a person index starred in a movie index. The edge
+        is merged into the CSR arrays on the next read, unless it is
+        already there.
+        """
+        self.pending_people.append(person)
+        self.pending_movies.append(movie)
+
+    def flush(self):
+        """
+        Merges people, movies and stars added since the CSR arrays were
+        built. Code reading the arrays directly should call this first.
+        """
+        if (not self.pending_people
+                and len(self.person_offsets) == len(self.person_ids) + 1
+                and len(self.movie_offsets) == len(self.movie_ids) + 1):
+            return
+
+        # Drop stars that are repeated or already recorded, as the sets
+        # in degrees.py do
+        built = len(self.person_offsets) - 1
+        offsets = self.person_offsets
+        seen = set()
+        star_people = array("i")
+        star_movies = array("i")
+        for person, movie in zip(self.pending_people, self.pending_movies):
+            if (person, movie) in seen or person < built and movie in \
+                    self.person_movies[offsets[person]:offsets[person + 1]]:
+                continue
+            seen.add((person, movie))
+            star_people.append(person)
+            star_movies.append(movie)
+
+        self.person_offsets, self.person_movies = merge_csr(
+            self.person_offsets, self.person_movies,
+            star_people, star_movies, len(self.person_ids))
+        self.movie_offsets, self.movie_stars = merge_csr(
+            self.movie_offsets, self.movie_stars,
+            star_movies, star_people, len(self.movie_ids))
+        self.pending_people = array("i")
+        self.pending_movies = array("i")
+
+    def movies_for(self, person):
+        """
+        Returns the movie indices a person starred in.
+        """
+        self.flush()
+        offsets = self.person_offsets
+        return self.person_movies[offsets[person]:offsets[person + 1]]
+
+    def stars_for(self, movie):
+        """
+        Returns the person indices starring in a movie.
+        """
+        self.flush()
+        offsets = self.movie_offsets
+        return self.movie_stars[offsets[movie]:offsets[movie + 1]]
+
+    def neighbors(self, person, mask=None):
+        """
+        Yields (movie, person) index pairs for people who starred with
+        the given person, including the person themself. If a mask is
+        given, only movies whose mask byte is set are followed.
+        """
+        self.flush()
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+        for k in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[k]
+            if mask is not None and not mask[movie]:
+                continue
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_stars[j]
+
+    def neighbors_for_person(self, person_id, mask=None):
+        """
+        Returns (movie_id, person_id) pairs for people who starred with
+        a given person, matching degrees.neighbors_for_person.
+        """
+        movie_ids = self.movie_ids
+        person_ids = self.person_ids
+        return {
+            (movie_ids[movie], person_ids[person])
+            for movie, person in self.neighbors(
+                self.person_index[person_id], mask)
+        }
+
+    def shortest_path(self, source, target, mask=None):
+        """
+        Breadth-first search between two person indices, following only
+        movies whose mask byte is set if a mask is given.
+
+        Returns (path, expanded) where path is a list of (movie, person)
+        index pairs, or None if the people are not connected.
+        """
+        if source == target:
+            return [], 0
+
+        self.flush()
+        parent_person = array("i", [-1]) * len(self.person_ids)
+        parent_movie = array("i", [-1]) * len(self.person_ids)
+        parent_person[source] = source
+        frontier = deque([source])
+        expanded = 0
+
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+        while frontier:
+            person = frontier.popleft()
+            expanded += 1
+            for k in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[k]
+                if mask is not None and not mask[movie]:
+                    continue
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    neighbor = movie_stars[j]
+                    if parent_person[neighbor] != -1:
+                        continue
+                    parent_person[neighbor] = person
+                    parent_movie[neighbor] = movie
+                    if neighbor == target:
+                        return trace(
+                            parent_person, parent_movie, source, target
+                        ), expanded
+                    frontier.append(neighbor)
+        return None, expanded
+
+    def shortest_paths_from(self, source, targets):
+        """
+        Breadth-first search from one person index to many, stopping
+        once every target is reached.
+
+        Returns a dict mapping each target to its list of (movie, person)
+        index pairs, or to None if it is not connected to the source.
+        """
+        self.flush()
+        parent_person = array("i", [-1]) * len(self.person_ids)
+        parent_movie = array("i", [-1]) * len(self.person_ids)
+        parent_person[source] = source
+        remaining = set(targets)
+        remaining.discard(source)
+        frontier = deque([source])
+
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+        while frontier and remaining:
+            person = frontier.popleft()
+            for k in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[k]
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    neighbor = movie_stars[j]
+                    if parent_person[neighbor] != -1:
+                        continue
+                    parent_person[neighbor] = person
+                    parent_movie[neighbor] = movie
+                    remaining.discard(neighbor)
+                    frontier.append(neighbor)
+
+        return {
+            target: trace(parent_person, parent_movie, source, target)
+            if parent_person[target] != -1 else None
+            for target in targets
+        }
+
+    def nbytes(self):
+        """
+        Returns the approximate memory used by the graph in bytes.
+        """
+        return deep_size(self.__dict__)
+
+
+class PeopleView(Mapping):
+    """
+    Read-only view shaped like degrees.people over a CompactGraph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        person = graph.person_index[person_id]
+        return {
+            "name": graph.person_names[person],
+            "birth": graph.person_births[person],
+            "movies": {graph.movie_ids[m] for m in graph.movies_for(person)}
+        }
+
+    def __contains__(self, person_id):
+        return person_id in self.graph.person_index
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return len(self.graph.person_ids)
+
+
+class MoviesView(Mapping):
+    """
+    Read-only view shaped like degrees.movies over a CompactGraph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        movie = graph.movie_index[movie_id]
+        return {
+            "title": graph.movie_titles[movie],
+            "year": graph.movie_years[movie],
+            "stars": {graph.person_ids[p] for p in graph.stars_for(movie)}
+        }
+
+    def __contains__(self, movie_id):
+        return movie_id in self.graph.movie_index
+
+    def __iter__(self):
+        return iter(self.graph.movie_ids)
+
+    def __len__(self):
+        return len(self.graph.movie_ids)
+
+
+class NamesView(Mapping):
+    """
+    Read-only view shaped like degrees.names over a CompactGraph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, name):
+        people = self.graph.name_index[name]
+        if not isinstance(people, tuple):
+            people = (people,)
+        return {self.graph.person_ids[person] for person in people}
+
+    def __contains__(self, name):
+        return name in self.graph.name_index
+
+    def __iter__(self):
+        return iter(self.graph.name_index)
+
+    def __len__(self):
+        return len(self.graph.name_index)
+
+
+def deep_size(obj, seen=None):
+    """
+    Returns the size in bytes of an object and everything it contains.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_size(key, seen) + deep_size(value, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += deep_size(item, seen)
+    return size
+
+
+def memory_report(graph, people, movies, names):
+    """
+    Compares the memory used by the dict layout and the compact graph.
+    """
+    dict_bytes = deep_size((people, movies, names))
+    compact_bytes = graph.nbytes()
+    return {
+        "people": len(graph.person_ids),
+        "movies": len(graph.movie_ids),
+        "stars": len(graph.person_movies),
+        "dict_bytes": dict_bytes,
+        "compact_bytes": compact_bytes,
+        "ratio": dict_bytes / compact_bytes if compact_bytes else 0.0
+    }
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python graph.py [directory]")
+    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+
+    import degrees
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    graph = CompactGraph.from_csv(directory)
+    print("Data loaded.")
+
+    report = memory_report(
+        graph, degrees.people, degrees.movies, degrees.names)
+    print(f"{report['people']} people, {report['movies']} movies, "
+          f"{report['stars']} stars")
+    print(f"Dict layout:    {report['dict_bytes'] / 2 ** 20:.1f} MiB")
+    print(f"Compact layout: {report['compact_bytes'] / 2 ** 20:.1f} MiB")
+    print(f"Ratio: {report['ratio']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
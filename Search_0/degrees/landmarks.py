@@ -0,0 +1,251 @@
+"""
+Landmark distance oracle for the degrees graph.
+
+A breadth-first search is run from each of k landmark people and the
+distance to every person is kept in a byte array. By the triangle
+inequality, for any landmark l
+
+    |d(a, l) - d(l, b)| <= d(a, b) <= d(a, l) + d(l, b)
+
+so a pair's separation can be bounded with k lookups, and the lower
+bound is an admissible heuristic for exact A* search.
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import random
+import time
+from array import array
+from collections import deque
+
+import snapshot
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 255
+
+FILENAME = "degrees.landmarks"
+
+
+def distances_from(graph, source):
+    """
+    Returns a byte array of BFS distances from a person index to every
+    person, capped below UNREACHABLE.
+    """
+    graph.flush()
+    distances = array("B", [UNREACHABLE]) * len(graph.person_ids)
+    distances[source] = 0
+    frontier = deque([source])
+
+    person_offsets = graph.person_offsets
+    person_movies = graph.person_movies
+    movie_offsets = graph.movie_offsets
+    movie_stars = graph.movie_stars
+    while frontier:
+        person = frontier.popleft()
+        distance = min(distances[person] + 1, UNREACHABLE - 1)
+        for k in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[k]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                neighbor = movie_stars[j]
+                if distances[neighbor] == UNREACHABLE:
+                    distances[neighbor] = distance
+                    frontier.append(neighbor)
+    return distances
+
+
+def choose_landmarks(graph, k, strategy="degree", seed=None):
+    """
+    Returns k person indices to use as landmarks, either the people
+    with the most co-star slots or a random sample.
+    """
+    count = len(graph.person_ids)
+    k = min(k, count)
+    if strategy == "random":
+        return random.Random(seed).sample(range(count), k)
+
+    person_offsets = graph.person_offsets
+    movie_offsets = graph.movie_offsets
+    person_movies = graph.person_movies
+
+    def degree(person):
+        return sum(
+            movie_offsets[movie + 1] - movie_offsets[movie]
+            for movie in person_movies[
+                person_offsets[person]:person_offsets[person + 1]])
+
+    return heapq.nlargest(k, range(count), key=degree)
+
+
+class LandmarkOracle():
+    """
+    Distance vectors from a set of landmark people.
+    """
+
+    def __init__(self, graph, landmarks, distances):
+        self.graph = graph
+        self.landmarks = landmarks
+        self.distances = distances
+
+    @classmethod
+    def build(cls, graph, k=16, strategy="degree", seed=None):
+        """
+        Chooses k landmarks and runs a BFS from each.
+        """
+        landmarks = choose_landmarks(graph, k, strategy, seed)
+        distances = [distances_from(graph, landmark) for landmark in landmarks]
+        return cls(graph, landmarks, distances)
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the separation of two person
+        indices. upper is math.inf when no landmark reaches both, and
+        both are math.inf when the people are known to be disconnected.
+        """
+        if source == target:
+            return 0, 0
+        lower = 1
+        upper = math.inf
+        for distances in self.distances:
+            a = distances[source]
+            b = distances[target]
+            if a == UNREACHABLE and b == UNREACHABLE:
+                continue
+            if a == UNREACHABLE or b == UNREACHABLE:
+                return math.inf, math.inf
+            lower = max(lower, abs(a - b))
+            upper = min(upper, a + b)
+        return lower, upper
+
+    def estimate(self, source_id, target_id):
+        """
+        Returns (lower, upper) bounds on the degrees of separation
+        between two person_ids.
+        """
+        index = self.graph.person_index
+        return self.bounds(index[source_id], index[target_id])
+
+    def heuristic(self, target):
+        """
+        Returns an admissible estimate of each person's distance to the
+        target person index, for use in A* search.
+        """
+        columns = [
+            (distances, distances[target]) for distances in self.distances
+            if distances[target] != UNREACHABLE
+        ]
+
+        def estimate(person):
+            best = 0
+            for distances, to_target in columns:
+                gap = abs(distances[person] - to_target)
+                if gap > best:
+                    best = gap
+            return best
+        return estimate
+
+    def shortest_path(self, source, target):
+        """
+        A* search between two person indices guided by the landmark
+        lower bounds.
+
+        Returns (path, expanded) where path is a list of (movie, person)
+        index pairs, or None if the people are not connected.
+        """
+        if self.bounds(source, target)[0] == math.inf:
+            return None, 0
+        graph = self.graph
+        estimate = self.heuristic(target)
+        depth = {source: 0}
+        parents = {source: None}
+        closed = set()
+        heap = [(estimate(source), 0, source)]
+        expanded = 0
+        while heap:
+            _, cost, person = heapq.heappop(heap)
+            if person in closed:
+                continue
+            if person == target:
+                path = []
+                while parents[person] is not None:
+                    movie, parent = parents[person]
+                    path.append((movie, person))
+                    person = parent
+                path.reverse()
+                return path, expanded
+            closed.add(person)
+            expanded += 1
+            cost += 1
+            for movie, neighbor in graph.neighbors(person):
+                if neighbor in closed or depth.get(neighbor, math.inf) <= cost:
+                    continue
+                depth[neighbor] = cost
+                parents[neighbor] = (movie, person)
+                heapq.heappush(
+                    heap, (cost + estimate(neighbor), cost, neighbor))
+        return None, expanded
+
+    def save(self, directory):
+        """
+        Writes the landmark distances next to the dataset's CSV files.
+        """
+        header = json.dumps({
+            "sources": snapshot.source_stats(directory),
+            "people": len(self.graph.person_ids),
+            "landmarks": [self.graph.person_ids[i] for i in self.landmarks]
+        }).encode("utf-8")
+        with open(os.path.join(directory, FILENAME), "wb") as f:
+            f.write(header + b"\n")
+            for distances in self.distances:
+                f.write(distances.tobytes())
+
+    @classmethod
+    def load(cls, graph, directory):
+        """
+        Returns the oracle saved for the dataset, or None if it is
+        missing or was built from different CSV files.
+        """
+        try:
+            with open(os.path.join(directory, FILENAME), "rb") as f:
+                header = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        count = len(graph.person_ids)
+        if (header.get("sources") != snapshot.source_stats(directory)
+                or header.get("people") != count
+                or len(body) != count * len(header["landmarks"])):
+            return None
+
+        landmarks = [graph.person_index[i] for i in header["landmarks"]]
+        distances = []
+        for i in range(len(landmarks)):
+            distances.append(array("B", body[i * count:(i + 1) * count]))
+        return cls(graph, landmarks, distances)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Precompute landmark distances for a degrees dataset.")
+    parser.add_argument("directory")
+    parser.add_argument("-k", type=int, default=16,
+                        help="number of landmarks")
+    parser.add_argument("--random", action="store_true",
+                        help="choose landmarks at random, not by degree")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    graph = snapshot.load_or_build(args.directory)
+    start = time.perf_counter()
+    oracle = LandmarkOracle.build(
+        graph, args.k, "random" if args.random else "degree", args.seed)
+    oracle.save(args.directory)
+    elapsed = time.perf_counter() - start
+    print(f"Built {len(oracle.landmarks)} landmarks over "
+          f"{len(graph.person_ids)} people in {elapsed:.1f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Prefix and fuzzy name index for the degrees dataset.
+
+Lowercase names are kept in one sorted list. Prefix search is a pair of
+bisects. Fuzzy search walks the sorted list as if it were a trie: the
+edit distance rows for a shared prefix are reused between neighbouring
+names, and once every entry in a row exceeds the bound, the whole run of
+names sharing that prefix is skipped with a bisect.
+"""
+
+import argparse
+from bisect import bisect_left
+
+import degrees
+
+
+def prefix_end(prefix):
+    """
+    Returns the smallest string greater than every string that starts
+    with prefix.
+    """
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class NameIndex():
+    """
+    Sorted index over the keys of degrees.names.
+    """
+
+    def __init__(self, names, people):
+        self.names = names
+        self.people = people
+        self.keys = sorted(names)
+
+    def candidates(self, key, distance=0):
+        """
+        Returns (person_id, name, birth, distance) tuples for everyone
+        whose lowercase name is key.
+        """
+        return [
+            (person_id, self.people[person_id]["name"],
+             self.people[person_id]["birth"], distance)
+            for person_id in sorted(self.names[key])
+        ]
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to limit people whose name starts with prefix,
+        shortest names first.
+        """
+        prefix = prefix.lower()
+        if not prefix:
+            return []
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix_end(prefix), start)
+        keys = self.keys[start:end]
+        if len(keys) > limit:
+            keys = sorted(keys, key=len)[:limit]
+        results = []
+        for key in sorted(keys, key=lambda key: (len(key), key)):
+            results.extend(self.candidates(key))
+        return results[:limit]
+
+    def fuzzy(self, query, max_distance=2, limit=10):
+        """
+        Returns up to limit people whose name is within max_distance
+        edits of query, closest first.
+        """
+        query = query.lower()
+        keys = self.keys
+        size = len(query)
+
+        # rows[d] holds the edit distances between query prefixes and
+        # the first d characters of the name being walked
+        rows = [list(range(size + 1))]
+        walked = ""
+        matches = []
+        i = 0
+        while i < len(keys):
+            key = keys[i]
+            shared = 0
+            limit_shared = min(len(walked), len(key))
+            while shared < limit_shared and walked[shared] == key[shared]:
+                shared += 1
+            del rows[shared + 1:]
+
+            pruned = False
+            for depth in range(shared, len(key)):
+                character = key[depth]
+                above = rows[-1]
+                row = [above[0] + 1]
+                for j in range(1, size + 1):
+                    row.append(min(
+                        row[j - 1] + 1,
+                        above[j] + 1,
+                        above[j - 1] + (query[j - 1] != character)))
+                rows.append(row)
+                if min(row) > max_distance:
+                    i = bisect_left(keys, prefix_end(key[:depth + 1]), i)
+                    pruned = True
+                    break
+            walked = key[:len(rows) - 1]
+
+            if not pruned:
+                if rows[-1][size] <= max_distance:
+                    matches.append((rows[-1][size], len(key), key))
+                i += 1
+
+        results = []
+        for distance, _, key in sorted(matches):
+            results.extend(self.candidates(key, distance))
+            if len(results) >= limit:
+                break
+        return results[:limit]
+
+    def search(self, query, max_distance=2, limit=10):
+        """
+        Returns ranked candidates for a query: exact matches, then
+        prefix completions, then fuzzy matches, without duplicates.
+        """
+        key = query.lower()
+        results = self.candidates(key) if key in self.names else []
+        seen = {result[0] for result in results}
+        for result in self.prefix(key, limit) + self.fuzzy(
+                key, max_distance, limit):
+            if len(results) >= limit:
+                break
+            if result[0] not in seen:
+                seen.add(result[0])
+                results.append(result)
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Look up people by name prefix or approximate name.")
+    parser.add_argument("directory")
+    parser.add_argument("queries", nargs="+")
+    parser.add_argument("--distance", type=int, default=2,
+                        help="maximum edit distance for fuzzy matches")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--compact", action="store_true",
+                        help="load the compact graph (and its snapshot)")
+    args = parser.parse_args()
+
+    degrees.load_data(args.directory, compact=args.compact)
+    index = NameIndex(degrees.names, degrees.people)
+    for query in args.queries:
+        print(f"{query}:")
+        for person_id, name, birth, distance in index.search(
+                query, args.distance, args.limit):
+            print(f"  ID: {person_id}, Name: {name}, Birth: {birth}, "
+                  f"Distance: {distance}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Resident degrees query server.
+
+Loads the dataset once and answers JSON-line requests over TCP on
+localhost or over a Unix socket. Each request is a JSON object with an
+"op" and an optional "id" that is echoed back:
+
+    {"op": "resolve", "name": "Kevin Bacon"}
+    {"op": "path", "source": "102", "target": "158"}
+    {"op": "stats"}
+
+Name resolution is answered on the event loop; path searches run in a
+process pool forked after loading, so workers share the graph.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import degrees
+
+# Number of recent request latencies kept for percentiles
+WINDOW = 10000
+
+
+class Stats():
+    """
+    Request counters and latency tracking for the server.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests = {}
+        self.errors = 0
+        self.in_flight = 0
+        self.latencies = deque(maxlen=WINDOW)
+
+    def record(self, op, seconds, error=False):
+        self.requests[op] = self.requests.get(op, 0) + 1
+        self.latencies.append(seconds)
+        if error:
+            self.errors += 1
+
+    def report(self):
+        uptime = time.monotonic() - self.started
+        total = sum(self.requests.values())
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction):
+            if not latencies:
+                return None
+            index = min(len(latencies) - 1, int(fraction * len(latencies)))
+            return round(latencies[index] * 1000, 3)
+
+        return {
+            "uptime": round(uptime, 3),
+            "requests": dict(self.requests),
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "throughput": round(total / uptime, 3) if uptime else 0.0,
+            "latency_ms": {
+                "p50": percentile(0.5),
+                "p90": percentile(0.9),
+                "p99": percentile(0.99),
+                "max": percentile(1.0)
+            }
+        }
+
+
+def find_path(source, target):
+    """
+    Runs a path search in a worker and returns the response fields.
+    """
+    path = degrees.bidirectional_shortest_path(source, target)
+    return {
+        "degrees": None if path is None else len(path),
+        "path": path,
+        "expanded": degrees.search_stats["expanded"]
+    }
+
+
+def resolve(name):
+    """
+    Returns every person matching a name, with their birth year.
+    """
+    return [
+        {"id": person_id,
+         "name": degrees.people[person_id]["name"],
+         "birth": degrees.people[person_id]["birth"]}
+        for person_id in sorted(degrees.names.get(name.lower(), set()))
+    ]
+
+
+class Server():
+    """
+    Dispatches requests from connected clients.
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.stats = Stats()
+
+    async def handle(self, request):
+        op = request.get("op")
+        if op == "resolve":
+            return {"people": resolve(str(request.get("name", "")))}
+        elif op == "path":
+            source = str(request.get("source"))
+            target = str(request.get("target"))
+            for person_id in (source, target):
+                if person_id not in degrees.people:
+                    raise KeyError(person_id)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, find_path, source, target)
+        elif op == "stats":
+            return self.stats.report()
+        raise ValueError(f"unknown op {op!r}")
+
+    async def respond(self, line, writer):
+        start = time.perf_counter()
+        self.stats.in_flight += 1
+        op = None
+        response = {}
+        try:
+            request = json.loads(line)
+            op = request.get("op")
+            response["id"] = request.get("id")
+            response.update(await self.handle(request))
+        except KeyError as e:
+            response["error"] = f"Person not found: {e.args[0]}"
+        except (ValueError, TypeError, AttributeError) as e:
+            response["error"] = str(e)
+        finally:
+            self.stats.in_flight -= 1
+        self.stats.record(
+            op or "invalid", time.perf_counter() - start, "error" in response)
+
+        if not writer.is_closing():
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+            await writer.drain()
+
+    async def connection(self, reader, writer):
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(self.respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+
+async def serve(server, host, port, unix):
+    if unix:
+        listener = await asyncio.start_unix_server(server.connection, unix)
+        print(f"Listening on {unix}")
+    else:
+        listener = await asyncio.start_server(server.connection, host, port)
+        print(f"Listening on {host}:{port}")
+    async with listener:
+        await listener.serve_forever()
+
+
+def make_executor(workers):
+    """
+    Returns a pool for path searches. Workers are forked up front, after
+    the data is loaded, so they share it copy-on-write.
+    """
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return ThreadPoolExecutor(workers)
+    executor = ProcessPoolExecutor(
+        workers, mp_context=multiprocessing.get_context("fork"))
+    executor.submit(int).result()
+    return executor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve degrees queries.")
+    parser.add_argument("directory")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on a Unix socket path instead")
+    parser.add_argument("--workers", type=int,
+                        default=multiprocessing.cpu_count())
+    parser.add_argument("--compact", action="store_true",
+                        help="load the compact graph (and its snapshot)")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    degrees.load_data(args.directory, compact=args.compact)
+    print("Data loaded.")
+
+    executor = make_executor(args.workers)
+    try:
+        asyncio.run(serve(Server(executor), args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+if __name__ == "__main__":
+    main()
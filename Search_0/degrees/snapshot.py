@@ -0,0 +1,159 @@
+"""
+Binary snapshot cache for the compact degrees graph.
+
+The snapshot sits next to the CSV files and is tied to their sizes and
+modification times. Its layout is a fixed preamble, a JSON header, the
+pickled string tables and then the CSR int arrays, which are memory
+mapped on load rather than read. A snapshot that fails to decode or
+whose arrays do not fit its tables is ignored and rebuilt.
+
+Loading unpickles the tables, which can run arbitrary code, so only use
+snapshots written by this module; delete any degrees.snapshot that came
+with a dataset from somewhere else.
+"""
+
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+
+from graph import CompactGraph
+
+MAGIC = b"DEGSNAP\0"
+VERSION = 1
+FILENAME = "degrees.snapshot"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+ARRAYS = ("person_offsets", "person_movies", "movie_offsets", "movie_stars")
+TABLES = ("person_ids", "person_names", "person_births", "person_index",
+          "movie_ids", "movie_titles", "movie_years", "movie_index",
+          "name_index")
+
+# Magic, version, header length
+PREAMBLE = struct.Struct("<8sII")
+ALIGNMENT = 8
+
+
+def snapshot_path(directory):
+    """
+    Returns the path of the snapshot for a dataset directory.
+    """
+    return os.path.join(directory, FILENAME)
+
+
+def source_stats(directory):
+    """
+    Returns the size and modification time of each CSV file.
+    """
+    stats = {}
+    for filename in SOURCES:
+        stat = os.stat(os.path.join(directory, filename))
+        stats[filename] = [stat.st_size, stat.st_mtime_ns]
+    return stats
+
+
+def save(graph, directory):
+    """
+    Writes a snapshot of the graph next to the dataset's CSV files.
+    """
+    graph.flush()
+    tables = pickle.dumps(
+        {name: getattr(graph, name) for name in TABLES},
+        protocol=pickle.HIGHEST_PROTOCOL)
+    arrays = [getattr(graph, name) for name in ARRAYS]
+
+    # Offsets are relative to the end of the header, so they can be
+    # laid out before the header's own length is known
+    layout = {}
+    offset = len(tables)
+    for name, values in zip(ARRAYS, arrays):
+        offset += -offset % ALIGNMENT
+        layout[name] = [offset, len(values)]
+        offset += len(values) * values.itemsize
+
+    header = json.dumps({
+        "sources": source_stats(directory),
+        "byteorder": sys.byteorder,
+        "itemsize": arrays[0].itemsize,
+        "tables": len(tables),
+        "arrays": layout
+    }).encode("utf-8")
+    header += b" " * (-(PREAMBLE.size + len(header)) % ALIGNMENT)
+
+    path = snapshot_path(directory)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        f.write(tables)
+        for name, values in zip(ARRAYS, arrays):
+            f.write(b"\0" * (layout[name][0] + PREAMBLE.size + len(header)
+                             - f.tell()))
+            f.write(values.tobytes())
+    os.replace(temporary, path)
+
+
+def load(directory):
+    """
+    Returns the graph stored in the dataset's snapshot, with its arrays
+    memory mapped, or None if the snapshot is missing or stale.
+    """
+    try:
+        with open(snapshot_path(directory), "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        magic, version, length = PREAMBLE.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION:
+            return None
+        header = json.loads(buffer[PREAMBLE.size:PREAMBLE.size + length])
+        if (header["sources"] != source_stats(directory)
+                or header["byteorder"] != sys.byteorder
+                or header["itemsize"] != 4):
+            return None
+
+        start = PREAMBLE.size + length
+        graph = CompactGraph()
+        tables = pickle.loads(buffer[start:start + header["tables"]])
+        for name in TABLES:
+            setattr(graph, name, tables[name])
+
+        view = memoryview(buffer)
+        for name in ARRAYS:
+            offset, count = header["arrays"][name]
+            offset += start
+            values = view[offset:offset + 4 * count].cast("i")
+            if len(values) != count:
+                return None
+            setattr(graph, name, values)
+
+        if (len(graph.person_offsets) != len(graph.person_ids) + 1
+                or len(graph.movie_offsets) != len(graph.movie_ids) + 1
+                or len(graph.person_movies) != graph.person_offsets[-1]
+                or len(graph.movie_stars) != graph.movie_offsets[-1]):
+            return None
+    except Exception:
+        # A damaged file can fail to decode in many ways, and every one
+        # of them just means the snapshot has to be rebuilt
+        return None
+    return graph
+
+
+def load_or_build(directory):
+    """
+    Returns the dataset's graph, from its snapshot when it is current,
+    otherwise by parsing the CSV files and writing a fresh snapshot.
+    """
+    graph = load(directory)
+    if graph is not None:
+        return graph
+
+    graph = CompactGraph.from_csv(directory)
+    try:
+        save(graph, directory)
+    except OSError:
+        pass
+    return graph
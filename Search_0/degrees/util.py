@@ -1,3 +1,9 @@
+import heapq
+import math
+import time
+from collections import deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -7,24 +13,33 @@ class Node():
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        # Maps each state in the frontier to how many nodes hold it
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
 
+    def forget(self, node):
+        count = self.states[node.state]
+        if count == 1:
+            del self.states[node.state]
+        else:
+            self.states[node.state] = count - 1
+        return node
+
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
-            return node
+            return self.forget(self.frontier.pop())
 
 
 class QueueFrontier(StackFrontier):
@@ -33,6 +48,239 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
-            return node
+            return self.forget(self.frontier.popleft())
+
+
+class SearchResult():
+    def __init__(self, path, expanded, peak_frontier, seconds):
+        # List of (action, state) pairs from the start, or None
+        self.path = path
+        self.expanded = expanded
+        self.peak_frontier = peak_frontier
+        self.seconds = seconds
+
+
+def solution(node):
+    """
+    Returns the (action, state) pairs leading from the root to a node.
+    """
+    path = []
+    while node.parent is not None:
+        path.append((node.action, node.state))
+        node = node.parent
+    path.reverse()
+    return path
+
+
+def breadth_first_search(start, goal, neighbors):
+    """
+    Breadth-first search over a neighbors(state) callback yielding
+    (action, state) pairs. Finds a path with the fewest steps.
+    """
+    began = time.perf_counter()
+    if start == goal:
+        return SearchResult([], 0, 0, time.perf_counter() - began)
+
+    frontier = QueueFrontier()
+    frontier.add(Node(state=start, parent=None, action=None))
+    reached = {start}
+    expanded = 0
+    peak = 1
+    while not frontier.empty():
+        node = frontier.remove()
+        expanded += 1
+        for action, state in neighbors(node.state):
+            if state in reached:
+                continue
+            child = Node(state=state, parent=node, action=action)
+            if state == goal:
+                return SearchResult(solution(child), expanded, peak,
+                                    time.perf_counter() - began)
+            reached.add(state)
+            frontier.add(child)
+        peak = max(peak, len(frontier.frontier))
+    return SearchResult(None, expanded, peak, time.perf_counter() - began)
+
+
+def bidirectional_search(start, goal, neighbors, reverse_neighbors=None):
+    """
+    Breadth-first search from both ends, always expanding the smaller
+    frontier one whole layer at a time. reverse_neighbors(state) yields
+    (action, predecessor) pairs and defaults to neighbors, which suits
+    undirected problems.
+    """
+    began = time.perf_counter()
+    if reverse_neighbors is None:
+        reverse_neighbors = neighbors
+    if start == goal:
+        return SearchResult([], 0, 0, time.perf_counter() - began)
+
+    # Maps each reached state to the (action, state) step leading back
+    # towards that side's starting state
+    forward = {start: None}
+    backward = {goal: None}
+    forward_frontier = [start]
+    backward_frontier = [goal]
+    expanded = 0
+    peak = 2
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            layer = forward_frontier
+            parents, other, expand = forward, backward, neighbors
+        else:
+            layer = backward_frontier
+            parents, other, expand = backward, forward, reverse_neighbors
+
+        next_layer = []
+        meeting = None
+        for state in layer:
+            expanded += 1
+            for action, neighbor in expand(state):
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = (action, state)
+                if neighbor in other:
+                    meeting = neighbor
+                    break
+                next_layer.append(neighbor)
+            if meeting is not None:
+                break
+
+        if meeting is not None:
+            return SearchResult(join_paths(meeting, forward, backward),
+                                expanded, peak, time.perf_counter() - began)
+        if parents is forward:
+            forward_frontier = next_layer
+        else:
+            backward_frontier = next_layer
+        peak = max(peak, len(forward_frontier) + len(backward_frontier))
+    return SearchResult(None, expanded, peak, time.perf_counter() - began)
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Joins forward and backward parent maps through the meeting state
+    into a single list of (action, state) pairs.
+    """
+    path = []
+    state = meeting
+    while forward[state] is not None:
+        action, parent = forward[state]
+        path.append((action, state))
+        state = parent
+    path.reverse()
+
+    state = meeting
+    while backward[state] is not None:
+        action, state = backward[state]
+        path.append((action, state))
+    return path
+
+
+def a_star_search(start, goal, neighbors, heuristic, cost=None):
+    """
+    A* search with a binary heap. Instead of decrease-key, an improved
+    entry is pushed again and stale entries are skipped when popped.
+    cost(state, action, next_state) defaults to 1 per step, and the
+    heuristic must not overestimate for the path to be optimal.
+    """
+    began = time.perf_counter()
+    best = {start: 0}
+    parents = {start: None}
+    closed = set()
+    heap = [(heuristic(start), 0, 0, start)]
+    order = 1
+    expanded = 0
+    peak = 1
+    while heap:
+        _, distance, _, state = heapq.heappop(heap)
+        if state in closed or distance > best[state]:
+            continue
+        if state == goal:
+            path = []
+            while parents[state] is not None:
+                action, parent = parents[state]
+                path.append((action, state))
+                state = parent
+            path.reverse()
+            return SearchResult(path, expanded, peak,
+                                time.perf_counter() - began)
+        closed.add(state)
+        expanded += 1
+        for action, neighbor in neighbors(state):
+            if neighbor in closed:
+                continue
+            step = 1 if cost is None else cost(state, action, neighbor)
+            if distance + step < best.get(neighbor, math.inf):
+                best[neighbor] = distance + step
+                parents[neighbor] = (action, state)
+                heapq.heappush(heap, (distance + step + heuristic(neighbor),
+                                      distance + step, order, neighbor))
+                order += 1
+        peak = max(peak, len(heap))
+    return SearchResult(None, expanded, peak, time.perf_counter() - began)
+
+
+def uniform_cost_search(start, goal, neighbors, cost=None):
+    """
+    Uniform-cost search: A* with a heuristic of zero.
+    """
+    return a_star_search(start, goal, neighbors, lambda state: 0, cost)
+
+
+def iterative_deepening_search(start, goal, neighbors, max_depth=None):
+    """
+    Depth-limited depth-first search run with growing limits until the
+    goal is found, nothing was cut off by the limit, or max_depth is
+    passed. Memory stays proportional to the depth.
+    """
+    began = time.perf_counter()
+    if start == goal:
+        return SearchResult([], 0, 0, time.perf_counter() - began)
+
+    expanded = 0
+    peak = 0
+    limit = 1
+    while max_depth is None or limit <= max_depth:
+        # One iterator of remaining (action, state) pairs per level
+        path = []
+        on_path = {start}
+        stack = [iter(neighbors(start))]
+        expanded += 1
+        cut_off = False
+        while stack:
+            peak = max(peak, len(stack))
+            step = next(stack[-1], None)
+            if step is None:
+                stack.pop()
+                if path:
+                    on_path.discard(path.pop()[1])
+                continue
+            action, state = step
+            if state in on_path:
+                continue
+            if state == goal:
+                path.append((action, state))
+                return SearchResult(path, expanded, peak,
+                                    time.perf_counter() - began)
+            if len(path) + 1 == limit:
+                cut_off = True
+                continue
+            path.append((action, state))
+            on_path.add(state)
+            expanded += 1
+            stack.append(iter(neighbors(state)))
+        if not cut_off:
+            break
+        limit += 1
+    return SearchResult(None, expanded, peak, time.perf_counter() - began)
+
+
+# Search strategies by name, for problems that want to choose one
+STRATEGIES = {
+    "bfs": breadth_first_search,
+    "bidirectional": bidirectional_search,
+    "ucs": uniform_cost_search,
+    "astar": a_star_search,
+    "iddfs": iterative_deepening_search
+}
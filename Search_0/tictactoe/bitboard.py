@@ -0,0 +1,201 @@
+"""
+Tic Tac Toe Player on bitboards
+
+Each side's marks are a 9-bit integer, with cell (i, j) at bit 3 * i + j.
+Winning lines are mask tests, a move is a bit OR, and the search passes
+the two integers down instead of copying boards. The functions named as
+in tictactoe.py take and return list boards, so runner.py can use this
+module in its place.
+"""
+
+import math
+
+X = "X"
+O = "O"
+EMPTY = None
+
+FULL = 0b111111111
+
+WIN_MASKS = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100
+]
+
+# WINS[marks] is True when the marks contain a complete line
+WINS = [any(marks & mask == mask for mask in WIN_MASKS)
+        for marks in range(FULL + 1)]
+
+# Cells tried first by minimax: center, corners, then edges
+MOVE_BITS = [1 << cell for cell in (4, 0, 2, 6, 8, 1, 3, 5, 7)]
+
+# Counters from the most recent minimax call
+search_stats = {"nodes": 0}
+
+
+def to_bits(board):
+    """
+    Returns the (x, o) bitboards for a list board.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def from_bits(x, o):
+    """
+    Returns the list board for a pair of bitboards.
+    """
+    return [[X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1
+             else EMPTY for j in range(3)] for i in range(3)]
+
+
+def bits_winner(x, o):
+    """
+    Returns the winner of a bitboard position, if there is one.
+    """
+    if WINS[x]:
+        return X
+    elif WINS[o]:
+        return O
+    return None
+
+
+def bits_terminal(x, o):
+    """
+    Returns True if the bitboard position is over.
+    """
+    return WINS[x] or WINS[o] or x | o == FULL
+
+
+def x_to_move(x, o):
+    """
+    Returns True if X moves next; X always moves first.
+    """
+    return bin(x).count("1") == bin(o).count("1")
+
+
+def negamax(me, opponent, alpha, beta):
+    """
+    Returns the value of the position for the side to move, me, after
+    the opponent's last move: 1 for a win, -1 for a loss, 0 for a draw.
+    """
+    search_stats["nodes"] += 1
+    if WINS[opponent]:
+        return -1
+    occupied = me | opponent
+    if occupied == FULL:
+        return 0
+
+    best = -2
+    for bit in MOVE_BITS:
+        if occupied & bit:
+            continue
+        value = -negamax(opponent, me | bit, -beta, -alpha)
+        if value > best:
+            best = value
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    break
+    return best
+
+
+def best_move(x, o):
+    """
+    Returns the bit index of the best move for the side to move.
+    """
+    search_stats["nodes"] = 0
+    if bits_terminal(x, o):
+        return None
+    me, opponent = (x, o) if x_to_move(x, o) else (o, x)
+    occupied = x | o
+
+    alpha = -math.inf
+    best = None
+    for bit in MOVE_BITS:
+        if occupied & bit:
+            continue
+        value = -negamax(opponent, me | bit, -math.inf, -alpha)
+        if best is None or value > alpha:
+            alpha = value
+            best = bit
+    return best.bit_length() - 1
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return from_bits(0, 0)
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    x, o = to_bits(board)
+    if bits_terminal(x, o):
+        return "Game Over"
+    return X if x_to_move(x, o) else O
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    x, o = to_bits(board)
+    if bits_terminal(x, o):
+        return "No Actions Left"
+    occupied = x | o
+    return {divmod(cell, 3) for cell in range(9) if not occupied >> cell & 1}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    x, o = to_bits(board)
+    i, j = action
+    bit = 1 << (3 * i + j)
+    if (x | o) & bit:
+        raise ValueError(f"{action} is already taken")
+    if x_to_move(x, o):
+        x |= bit
+    else:
+        o |= bit
+    return from_bits(x, o)
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    return bits_winner(*to_bits(board))
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return bits_terminal(*to_bits(board))
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    return {X: 1, O: -1, None: 0}[winner(board)]
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    cell = best_move(*to_bits(board))
+    return None if cell is None else divmod(cell, 3)
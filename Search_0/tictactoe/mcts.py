@@ -0,0 +1,283 @@
+"""
+Monte Carlo tree search for m,n,k tic-tac-toe
+
+For boards too large to search exhaustively, Tree.best_move grows a UCT
+tree from random playouts on mnk bitboards for a number of iterations
+or milliseconds and plays the most visited move. The tree is kept
+between moves: when the next position is a child or grandchild of the
+last root, search continues from that subtree. With workers, each
+process grows its own tree from the same position and their root visit
+counts are summed.
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import mnk
+
+# Weight of the exploration term in the UCT formula
+EXPLORATION = math.sqrt(2)
+
+# Counters from the most recent best_move call
+search_stats = {"iterations": 0, "reused": 0, "seconds": 0.0}
+
+
+class Node():
+    """
+    A position in the tree, reached by mover playing cell.
+    """
+
+    def __init__(self, game, x, o, cell=None, parent=None):
+        self.x = x
+        self.o = o
+        self.cell = cell
+        self.parent = parent
+        self.children = {}
+        self.visits = 0
+
+        # Playout score for mover: 1 per win and 0.5 per draw
+        self.score = 0.0
+
+        x_turn = x.bit_count() == o.bit_count()
+        self.mover = mnk.O if x_turn else mnk.X
+        if cell is None:
+            self.winner = game.winner(x, o)
+        else:
+            self.winner = self.mover if game.wins(
+                x if self.mover == mnk.X else o, cell) else None
+        self.terminal = self.winner is not None or x | o == game.full
+        self.untried = [] if self.terminal else [
+            cell for cell in game.order if not (x | o) >> cell & 1]
+
+    def select(self):
+        """
+        Returns the child with the highest UCT value.
+        """
+        log_visits = math.log(self.visits)
+        return max(self.children.values(), key=lambda child: (
+            child.score / child.visits
+            + EXPLORATION * math.sqrt(log_visits / child.visits)))
+
+
+def playout(game, x, o, rng):
+    """
+    Plays random moves from a position to the end of the game and
+    returns the winner, or None for a draw.
+    """
+    x_turn = x.bit_count() == o.bit_count()
+    cells = [cell for cell in range(game.size) if not (x | o) >> cell & 1]
+    rng.shuffle(cells)
+    for cell in cells:
+        if x_turn:
+            x |= 1 << cell
+            if game.wins(x, cell):
+                return mnk.X
+        else:
+            o |= 1 << cell
+            if game.wins(o, cell):
+                return mnk.O
+        x_turn = not x_turn
+    return None
+
+
+class Tree():
+    """
+    A UCT search tree for one game, kept between moves.
+    """
+
+    def __init__(self, game, seed=None):
+        self.game = game
+        self.rng = random.Random(seed)
+        self.root = None
+
+    def root_for(self, x, o):
+        """
+        Returns the node for a position, reusing the current tree when the
+        position is at most two moves below its root.
+        """
+        nodes = [] if self.root is None else [self.root]
+        for _ in range(3):
+            for node in nodes:
+                if node.x == x and node.o == o:
+                    node.parent = None
+                    search_stats["reused"] = node.visits
+                    return node
+            nodes = [child for node in nodes
+                     for child in node.children.values()]
+        search_stats["reused"] = 0
+        return Node(self.game, x, o)
+
+    def iterate(self, root):
+        """
+        Runs one selection, expansion, playout and backup from root.
+        """
+        node = root
+        while not node.untried and not node.terminal:
+            node = node.select()
+
+        if node.untried:
+            cell = node.untried.pop(self.rng.randrange(len(node.untried)))
+            x, o = node.x, node.o
+            if node.mover == mnk.O:
+                x |= 1 << cell
+            else:
+                o |= 1 << cell
+            child = Node(self.game, x, o, cell, node)
+            node.children[cell] = child
+            node = child
+
+        if node.terminal:
+            winner = node.winner
+        else:
+            winner = playout(self.game, node.x, node.o, self.rng)
+
+        while node is not None:
+            node.visits += 1
+            if winner is None:
+                node.score += 0.5
+            elif winner == node.mover:
+                node.score += 1
+            node = node.parent
+
+    def search(self, x, o, iterations=None, budget_ms=None):
+        """
+        Grows the tree for a position until iterations have run or
+        budget_ms milliseconds have passed, and returns its root.
+        """
+        start = time.perf_counter()
+        if iterations is None and budget_ms is None:
+            budget_ms = 1000
+        deadline = math.inf if budget_ms is None else start + budget_ms / 1000
+
+        self.root = self.root_for(x, o)
+        count = 0
+        while not self.root.terminal and (
+                iterations is None or count < iterations):
+            if time.perf_counter() > deadline:
+                break
+            self.iterate(self.root)
+            count += 1
+
+        search_stats["iterations"] = count
+        search_stats["seconds"] = time.perf_counter() - start
+        return self.root
+
+    def visit_counts(self, x, o, iterations=None, budget_ms=None):
+        """
+        Searches a position and returns the visits of each root move.
+        """
+        root = self.search(x, o, iterations, budget_ms)
+        return {cell: child.visits for cell, child in root.children.items()}
+
+    def best_move(self, x, o, iterations=None, budget_ms=None):
+        """
+        Returns the most visited cell after searching a position, or None
+        if the game is over.
+        """
+        return most_visited(self.visit_counts(x, o, iterations, budget_ms))
+
+
+def most_visited(counts):
+    """
+    Returns the cell with the most visits, the lowest on ties.
+    """
+    if not counts:
+        return None
+    return min(counts, key=lambda cell: (-counts[cell], cell))
+
+
+# Trees by (m, n, k) in this process, so each worker keeps its own
+trees = {}
+
+# Process pools for root-parallel search by size, started on first use
+executors = {}
+
+
+def tree_for(m, n, k):
+    """
+    Returns this process's tree for an m,n,k game.
+    """
+    if (m, n, k) not in trees:
+        trees[m, n, k] = Tree(mnk.Game(m, n, k))
+    return trees[m, n, k]
+
+
+def worker_counts(m, n, k, x, o, iterations, budget_ms, seed):
+    """
+    Searches a position with this process's tree and returns the visits
+    of each root move.
+    """
+    tree = tree_for(m, n, k)
+    tree.rng.seed(seed)
+    return tree.visit_counts(x, o, iterations, budget_ms)
+
+
+def parallel_move(game, x, o, workers, iterations=None, budget_ms=None):
+    """
+    Searches a position in workers processes, each with its own tree and
+    a share of the iterations, and returns the cell with the most visits
+    summed over all of them.
+    """
+    if workers <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return tree_for(game.m, game.n, game.k).best_move(
+            x, o, iterations, budget_ms)
+    if workers not in executors:
+        executors[workers] = ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("fork"))
+
+    share = None if iterations is None else -(-iterations // workers)
+    futures = [executors[workers].submit(
+        worker_counts, game.m, game.n, game.k, x, o, share, budget_ms,
+        random.getrandbits(32)) for _ in range(workers)]
+    totals = {}
+    for future in futures:
+        for cell, visits in future.result().items():
+            totals[cell] = totals.get(cell, 0) + visits
+    return most_visited(totals)
+
+
+def mcts(board, k=None, iterations=None, budget_ms=1000, workers=1):
+    """
+    Returns the action chosen by Monte Carlo tree search for the current
+    player on a list board.
+    """
+    game = mnk.game_for(board, k)
+    cell = parallel_move(game, *game.to_bits(board), workers,
+                         iterations, budget_ms)
+    return None if cell is None else divmod(cell, game.n)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play an m,n,k game with MCTS against mnk.minimax.")
+    parser.add_argument("m", type=int)
+    parser.add_argument("n", type=int)
+    parser.add_argument("k", type=int)
+    parser.add_argument("--budget", type=int, default=1000,
+                        help="milliseconds per move")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="processes for MCTS playouts")
+    parser.add_argument("--mcts-plays", choices=(mnk.X, mnk.O),
+                        default=mnk.X)
+    args = parser.parse_args()
+
+    board = mnk.initial_state(args.m, args.n)
+    while not mnk.terminal(board, args.k):
+        if mnk.player(board) == args.mcts_plays:
+            action = mcts(board, args.k, budget_ms=args.budget,
+                          workers=args.workers)
+        else:
+            action = mnk.minimax(board, args.k, args.budget)
+        board = mnk.result(board, action)
+    for row in board:
+        print(" ".join(cell or "." for cell in row))
+    print(f"Winner: {mnk.winner(board, args.k)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+"""
+Tic Tac Toe on m x n boards where k in a row wins
+
+Boards larger than 3x3 cannot be searched to the end, so best_move runs
+iterative-deepening alpha-beta under a time budget. Undecided leaves are
+scored by the lines still open to only one side, weighted by how many of
+that side's marks they hold. When time runs out the move from the
+deepest finished iteration is returned. Positions are a pair of
+bitboards with cell (i, j) at bit n * i + j, as in bitboard.py.
+"""
+
+import argparse
+import math
+import os
+import time
+
+import parallel
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Score of a won position, less one per ply so quicker wins score higher
+WIN = 10 ** 9
+
+# Starting value of the shared alpha bound, below every real value
+NO_BOUND = -WIN - 1
+
+# Nodes searched between checks of the clock
+CHECK_EVERY = 1024
+
+# A function that returns True once the current search is no longer
+# wanted, polled with the clock, or None to never stop early. A cancelled
+# search ends as if its time budget were spent
+cancelled = None
+
+# Counters from the most recent best_move call
+search_stats = {"nodes": 0, "depth": 0, "seconds": 0.0}
+
+
+class Timeout(Exception):
+    """
+    Raised inside the search when the move's time budget is spent or
+    the search is cancelled.
+    """
+
+
+class Game():
+    """
+    The lines and move order of an m x n board where k in a row wins.
+    """
+
+    def __init__(self, m=3, n=3, k=3):
+        if m < 1 or n < 1 or not 1 <= k <= max(m, n):
+            raise ValueError(f"no {k} in a row on a {m}x{n} board")
+        self.m = m
+        self.n = n
+        self.k = k
+        self.size = m * n
+        self.full = (1 << self.size) - 1
+
+        # Every k-cell window along a row, column or diagonal
+        self.lines = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_i, end_j = i + (k - 1) * di, j + (k - 1) * dj
+                    if 0 <= end_i < m and 0 <= end_j < n:
+                        self.lines.append(sum(
+                            1 << (n * (i + step * di) + j + step * dj)
+                            for step in range(k)))
+        self.lines_through = [[line for line in self.lines if line >> cell & 1]
+                              for cell in range(self.size)]
+
+        # Cells nearest the center first, since they lie on the most lines
+        self.order = sorted(range(self.size), key=lambda cell: (
+            abs(cell // n - (m - 1) / 2) + abs(cell % n - (n - 1) / 2), cell))
+
+        # Score of an open line holding a given number of one side's marks
+        self.weights = [0] + [10 ** count for count in range(k - 1)]
+
+        # Best reply found for each position, tried first next time
+        self.hints = {}
+
+    def to_bits(self, board):
+        """
+        Returns the (x, o) bitboards for a list board.
+        """
+        x = o = 0
+        for i in range(self.m):
+            for j in range(self.n):
+                if board[i][j] == X:
+                    x |= 1 << (self.n * i + j)
+                elif board[i][j] == O:
+                    o |= 1 << (self.n * i + j)
+        return x, o
+
+    def from_bits(self, x, o):
+        """
+        Returns the list board for a pair of bitboards.
+        """
+        return [[X if x >> (self.n * i + j) & 1
+                 else O if o >> (self.n * i + j) & 1 else EMPTY
+                 for j in range(self.n)] for i in range(self.m)]
+
+    def wins(self, marks, cell):
+        """
+        Returns True if marks complete a line through cell.
+        """
+        return any(marks & line == line for line in self.lines_through[cell])
+
+    def winner(self, x, o):
+        """
+        Returns the winner of a bitboard position, if there is one.
+        """
+        for line in self.lines:
+            if x & line == line:
+                return X
+            if o & line == line:
+                return O
+        return None
+
+    def terminal(self, x, o):
+        """
+        Returns True if the bitboard position is over.
+        """
+        return x | o == self.full or self.winner(x, o) is not None
+
+    def evaluate(self, me, opponent):
+        """
+        Returns the open-line score of a position for the side to move.
+        """
+        score = 0
+        for line in self.lines:
+            if not line & opponent:
+                score += self.weights[(line & me).bit_count()]
+            elif not line & me:
+                score -= self.weights[(line & opponent).bit_count()]
+        return score
+
+    def moves(self, occupied, first=None):
+        """
+        Returns the empty cells in search order, with first leading.
+        """
+        moves = [cell for cell in self.order if not occupied >> cell & 1]
+        if first is not None and first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def negamax(self, me, opponent, last, depth, alpha, beta, ply, deadline):
+        """
+        Returns the value of the position for the side to move, me, after
+        the opponent played cell last.
+        """
+        search_stats["nodes"] += 1
+        if (search_stats["nodes"] % CHECK_EVERY == 0
+                and (time.perf_counter() > deadline
+                     or cancelled is not None and cancelled())):
+            raise Timeout
+        if self.wins(opponent, last):
+            return ply - WIN
+        occupied = me | opponent
+        if occupied == self.full:
+            return 0
+        if depth == 0:
+            return self.evaluate(me, opponent)
+
+        best = -math.inf
+        best_cell = None
+        for cell in self.moves(occupied, self.hints.get((me, opponent))):
+            value = -self.negamax(opponent, me | 1 << cell, cell, depth - 1,
+                                  -beta, -alpha, ply + 1, deadline)
+            if value > best:
+                best = value
+                best_cell = cell
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+        self.hints[me, opponent] = best_cell
+        return best
+
+    def best_move(self, x, o, budget_ms=1000, max_depth=None):
+        """
+        Returns the best cell found for the side to move within budget_ms
+        milliseconds, or None if the game is over.
+        """
+        start = time.perf_counter()
+        deadline = start + budget_ms / 1000
+        search_stats["nodes"] = 0
+        search_stats["depth"] = 0
+        if self.terminal(x, o):
+            return None
+
+        x_turn = (x.bit_count() == o.bit_count())
+        me, opponent = (x, o) if x_turn else (o, x)
+        empties = self.size - (x | o).bit_count()
+        if max_depth is None or max_depth > empties:
+            max_depth = empties
+        if len(self.hints) > 10 ** 6:
+            self.hints.clear()
+
+        best = self.moves(x | o)[0]
+        for depth in range(1, max_depth + 1):
+            alpha = -math.inf
+            found = None
+            try:
+                for cell in self.moves(x | o, best):
+                    value = -self.negamax(opponent, me | 1 << cell, cell,
+                                          depth - 1, -math.inf, -alpha, 1,
+                                          deadline)
+                    if found is None or value > alpha:
+                        alpha = value
+                        found = cell
+            except Timeout:
+                # The previous best is searched first, so any move that
+                # has already beaten it at this depth is better still
+                if found is not None and found != best:
+                    best = found
+                break
+            best = found
+            search_stats["depth"] = depth
+            if abs(alpha) > WIN - self.size:
+                break
+
+        search_stats["seconds"] = time.perf_counter() - start
+        return best
+
+
+# Games by (m, n, k), so hints survive between moves
+games = {}
+
+
+def search_root_move(m, n, k, x, o, cell, depth, deadline):
+    """
+    Searches one root move to depth in parallel.run's window. Returns the
+    cell, its value or None on timeout, and the number of nodes searched.
+    """
+    # Tasks still queued when time runs out give up without searching,
+    # since one too small to reach a clock check would not stop otherwise
+    if time.perf_counter() > deadline:
+        return cell, None, 0
+
+    key = (m, n, k)
+    if key not in games:
+        games[key] = Game(m, n, k)
+    game = games[key]
+    me, opponent = (x, o) if x.bit_count() == o.bit_count() else (o, x)
+
+    search_stats["nodes"] = 0
+    alpha = parallel.window_alpha()
+    try:
+        value = -game.negamax(opponent, me | 1 << cell, cell, depth - 1,
+                              -math.inf, -alpha, 1, deadline)
+    except Timeout:
+        return cell, None, search_stats["nodes"]
+    parallel.raise_alpha(value)
+    return cell, value, search_stats["nodes"]
+
+
+def parallel_best_move(game, x, o, workers=None, budget_ms=1000,
+                       max_depth=None):
+    """
+    Returns the best cell for the side to move, searching the root moves
+    of each iterative-deepening depth across workers processes with
+    parallel.run. Ties go to the cell earliest in game.order, so with
+    max_depth and no budget_ms the move does not depend on workers.
+    """
+    start = time.perf_counter()
+    deadline = math.inf if budget_ms is None else start + budget_ms / 1000
+    search_stats["depth"] = 0
+    if game.terminal(x, o):
+        return None
+
+    if workers is None:
+        workers = os.cpu_count()
+
+    moves = game.moves(x | o)
+    empties = len(moves)
+    if max_depth is None or max_depth > empties:
+        max_depth = empties
+
+    nodes = 0
+    best = moves[0]
+    for depth in range(1, max_depth + 1):
+        tasks = [(game.m, game.n, game.k, x, o, cell, depth, deadline)
+                 for cell in game.moves(x | o, best)]
+        results = parallel.run(search_root_move, tasks, workers, NO_BOUND,
+                               stop=lambda result: result[1] is None)
+        nodes += sum(result[2] for result in results)
+        if any(value is None for _, value, _ in results):
+            break
+
+        best = parallel.first_best(results, moves)
+        search_stats["depth"] = depth
+        if abs(max(value for _, value, _ in results)) > WIN - game.size:
+            break
+
+    search_stats["nodes"] = nodes
+    search_stats["seconds"] = time.perf_counter() - start
+    return best
+
+
+def game_for(board, k=None):
+    """
+    Returns the Game for a list board. k defaults to the board's
+    shorter side, at most 4.
+    """
+    m, n = len(board), len(board[0])
+    if k is None:
+        k = min(m, n, 4)
+    if (m, n, k) not in games:
+        games[m, n, k] = Game(m, n, k)
+    return games[m, n, k]
+
+
+def initial_state(m=3, n=3):
+    """
+    Returns starting state of an m x n board.
+    """
+    return [[EMPTY] * n for _ in range(m)]
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    cells = [cell for row in board for cell in row]
+    return X if cells.count(X) == cells.count(O) else O
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    return {(i, j) for i, row in enumerate(board)
+            for j, cell in enumerate(row) if cell == EMPTY}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    i, j = action
+    if board[i][j] != EMPTY:
+        raise ValueError(f"{action} is already taken")
+    new_board = [row[:] for row in board]
+    new_board[i][j] = player(board)
+    return new_board
+
+
+def winner(board, k=None):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    game = game_for(board, k)
+    return game.winner(*game.to_bits(board))
+
+
+def terminal(board, k=None):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    game = game_for(board, k)
+    return game.terminal(*game.to_bits(board))
+
+
+def minimax(board, k=None, budget_ms=1000, workers=1):
+    """
+    Returns the best action found for the current player on the board
+    within budget_ms milliseconds, searching across workers processes
+    when there is more than one. Every worker count goes through
+    parallel_best_move, so equal scores are always settled by game.order.
+    """
+    game = game_for(board, k)
+    cell = parallel_best_move(game, *game.to_bits(board), workers, budget_ms)
+    return None if cell is None else divmod(cell, game.n)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play an m,n,k game against itself.")
+    parser.add_argument("m", type=int)
+    parser.add_argument("n", type=int)
+    parser.add_argument("k", type=int)
+    parser.add_argument("--budget", type=int, default=1000,
+                        help="milliseconds per move")
+    args = parser.parse_args()
+
+    board = initial_state(args.m, args.n)
+    while not terminal(board, args.k):
+        action = minimax(board, args.k, args.budget)
+        print(f"{player(board)} plays {action}: depth "
+              f"{search_stats['depth']}, {search_stats['nodes']} nodes in "
+              f"{search_stats['seconds']:.2f}s")
+        board = result(board, action)
+    for row in board:
+        print(" ".join(cell or "." for cell in row))
+    print(f"Winner: {winner(board, args.k)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Root-parallel search shared by tictactoe.py and mnk.py
+
+Each root move is searched as its own task, by a pool of forked workers
+that share one alpha bound. A task searches with alpha one below the
+best score any worker has found so far, so a move that ties it still
+gets its exact score, and the caller picks the top score earliest in its
+move order. The chosen move therefore does not depend on the number of
+workers or the order they finish in.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Process pools by worker count, each with the alpha bound its workers
+# share
+executors = {}
+
+# The shared alpha bound in this process, set by share_alpha
+shared_alpha = None
+
+
+def share_alpha(value):
+    """
+    Sets the shared alpha bound read by window_alpha and raise_alpha.
+    """
+    global shared_alpha
+    shared_alpha = value
+
+
+def run(function, tasks, workers, no_bound, stop=None):
+    """
+    Resets the shared alpha bound to no_bound, which must be below every
+    score, and returns function(*task) for each task. The tasks run in
+    workers forked processes, or in this one when workers is 1 or fork
+    is not available. Once stop(result) is true for a result, the tasks
+    not yet started are dropped and the results so far are returned.
+    """
+    if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+        if workers not in executors:
+            context = multiprocessing.get_context("fork")
+            value = context.Value("q", no_bound)
+            executors[workers] = (ProcessPoolExecutor(
+                workers, mp_context=context, initializer=share_alpha,
+                initargs=(value,)), value)
+        executor, value = executors[workers]
+        value.value = no_bound
+        futures = [executor.submit(function, *task) for task in tasks]
+        results = []
+        for future in futures:
+            results.append(future.result())
+            if stop is not None and stop(results[-1]):
+                for pending in futures:
+                    pending.cancel()
+                break
+        return results
+
+    if shared_alpha is None:
+        share_alpha(multiprocessing.Value("q", no_bound))
+    shared_alpha.value = no_bound
+    results = []
+    for task in tasks:
+        results.append(function(*task))
+        if stop is not None and stop(results[-1]):
+            break
+    return results
+
+
+def window_alpha():
+    """
+    Returns the alpha a root move should be searched with.
+    """
+    return shared_alpha.value - 1
+
+
+def raise_alpha(score):
+    """
+    Records a root move's exact score in the shared alpha bound.
+    """
+    with shared_alpha.get_lock():
+        if score > shared_alpha.value:
+            shared_alpha.value = score
+
+
+def first_best(results, order):
+    """
+    Returns the cell with the top score among (cell, score, ...) results,
+    taking the cell earliest in order on ties.
+    """
+    top = max(result[1] for result in results)
+    return min((result[0] for result in results if result[1] == top),
+               key=order.index)
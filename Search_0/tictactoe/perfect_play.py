@@ -0,0 +1,107 @@
+"""
+Builds the perfect-play table used by tictactoe.minimax.
+
+Every position reachable from the empty board is solved once, and the
+table stores one byte per base-3 board encoding: the position's value
+for X (plus one) in the high nibble and the best cell in the low nibble,
+or NO_MOVE for positions that are over or unreachable. The build checks
+every entry against the recursive search in tictactoe.py before writing.
+"""
+
+import math
+import sys
+
+import bitboard
+import tictactoe
+
+SIZE = 3 ** 9
+NO_MOVE = 0xFF
+
+
+def bits_index(x, o):
+    """
+    Returns the base-3 encoding of a bitboard position, with cell 0 as
+    the most significant digit, matching tictactoe.table_index.
+    """
+    index = 0
+    for cell in range(9):
+        index = 3 * index + (1 if x >> cell & 1 else 2 if o >> cell & 1 else 0)
+    return index
+
+
+def solve():
+    """
+    Solves every reachable position. Returns the table and a dict of
+    each reachable position's value for X.
+    """
+    table = bytearray([NO_MOVE]) * SIZE
+    values = {}
+
+    def value(x, o):
+        if (x, o) in values:
+            return values[x, o]
+        winner = bitboard.bits_winner(x, o)
+        if winner is not None or x | o == bitboard.FULL:
+            result = {tictactoe.X: 1, tictactoe.O: -1, None: 0}[winner]
+        else:
+            x_turn = bitboard.x_to_move(x, o)
+            result = None
+            for bit in bitboard.MOVE_BITS:
+                if (x | o) & bit:
+                    continue
+                child = value(x | bit, o) if x_turn else value(x, o | bit)
+                if (result is None or (x_turn and child > result)
+                        or (not x_turn and child < result)):
+                    result = child
+                    cell = bit.bit_length() - 1
+            table[bits_index(x, o)] = (result + 1) << 4 | cell
+        values[x, o] = result
+        return result
+
+    value(0, 0)
+    return table, values
+
+
+def verify(table, values):
+    """
+    Checks every table entry against tictactoe's recursive search.
+    Returns the number of positions with a move.
+    """
+    checked = 0
+    for (x, o), value in values.items():
+        entry = table[bits_index(x, o)]
+        board = bitboard.from_bits(x, o)
+        if tictactoe.terminal(board):
+            assert entry == NO_MOVE, f"terminal position has a move: {board}"
+            continue
+
+        position = tictactoe.Position(board)
+        expected = tictactoe.MAX_VALUE(position, -math.inf, math.inf) \
+            if position.player() == tictactoe.X \
+            else tictactoe.MIN_VALUE(position, -math.inf, math.inf)
+        assert (entry >> 4) - 1 == expected == value, f"wrong value: {board}"
+
+        position.apply(entry & 0xF)
+        reached = tictactoe.MIN_VALUE(position) \
+            if position.player() == tictactoe.O \
+            else tictactoe.MAX_VALUE(position)
+        assert reached == expected, f"suboptimal move: {board}"
+        checked += 1
+    return checked
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python perfect_play.py [output]")
+    path = sys.argv[1] if len(sys.argv) == 2 else tictactoe.TABLE_PATH
+
+    table, values = solve()
+    checked = verify(table, values)
+    with open(path, "wb") as f:
+        f.write(tictactoe.TABLE_MAGIC + table)
+    print(f"Solved {len(values)} positions, verified {checked} moves, "
+          f"wrote {path}.")
+
+
+if __name__ == "__main__":
+    main()
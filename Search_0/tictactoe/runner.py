@@ -1,9 +1,52 @@
+import multiprocessing
 import pygame
 import sys
 import time
+from multiprocessing.pool import ThreadPool
 
 import Search_0.tictactoe.tictactoe as ttt
 
+
+def start_pool(game):
+    """
+    Returns a one-worker pool for the AI's searches. The worker is a
+    forked process where possible, so searches do not compete with the
+    render loop for the GIL; otherwise it is a thread. It must be started
+    before pygame.init, since forking once SDL is running is unsafe.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork").Pool(
+            1, initializer=watch_game, initargs=(game,))
+    return ThreadPool(1, initializer=watch_game, initargs=(game,))
+
+
+def watch_game(game):
+    """
+    Runs in the pool's worker and keeps the shared game number for think.
+    """
+    global current_game
+    current_game = game
+
+
+def think(board, number):
+    """
+    Returns the AI's move on board in game number, or None if that game
+    is reset before the search ends.
+    """
+    ttt.cancelled = lambda: current_game.value != number
+    try:
+        return ttt.minimax(board)
+    except ttt.Cancelled:
+        return None
+
+
+# Shortest time the AI appears to think, in seconds
+THINK_SECONDS = 0.5
+
+# Number of the current game, raised on reset to cancel the AI's search
+game = multiprocessing.Value("i", 0)
+pool = start_pool(game)
+
 pygame.init()
 size = width, height = 600, 400
 
@@ -19,12 +62,16 @@ moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
+
+# Pending AI move and when it was requested
+search = None
+search_started = None
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            pool.terminate()
             sys.exit()
 
     screen.fill(black)
@@ -102,21 +149,23 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            dots = int(time.time() * 3) % 4
+            title = "Computer thinking" + "." * dots + " " * (3 - dots)
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Start the AI's search in the background, and play its move
+        # once it is ready, without blocking the window meanwhile
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if search is None:
+                search = pool.apply_async(think, (board, game.value))
+                search_started = time.time()
+            elif (search.ready()
+                  and time.time() - search_started >= THINK_SECONDS):
+                board = ttt.result(board, search.get())
+                search = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -127,20 +176,26 @@ while True:
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
                         board = ttt.result(board, (i, j))
 
-        if game_over:
-            againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
-            again = mediumFont.render("Play Again", True, black)
-            againRect = again.get_rect()
-            againRect.center = againButton.center
-            pygame.draw.rect(screen, white, againButton)
-            screen.blit(again, againRect)
-            click, _, _ = pygame.mouse.get_pressed()
-            if click == 1:
-                mouse = pygame.mouse.get_pos()
-                if againButton.collidepoint(mouse):
-                    time.sleep(0.2)
-                    user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+        # Play again once the game is over, or reset it at any time
+        againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
+        again = mediumFont.render(
+            "Play Again" if game_over else "Reset", True, black)
+        againRect = again.get_rect()
+        againRect.center = againButton.center
+        pygame.draw.rect(screen, white, againButton)
+        screen.blit(again, againRect)
+        click, _, _ = pygame.mouse.get_pressed()
+        if click == 1:
+            mouse = pygame.mouse.get_pos()
+            if againButton.collidepoint(mouse):
+                time.sleep(0.2)
+                # Cancel the AI's search, which stops at its next check
+                # of the game number
+                if search is not None:
+                    with game.get_lock():
+                        game.value += 1
+                    search = None
+                user = None
+                board = ttt.initial_state()
 
     pygame.display.flip()
@@ -4,11 +4,92 @@ Tic Tac Toe Player
 
 import math
 import copy
+import os
+
+# runner.py imports this module as Search_0.tictactoe.tictactoe, while
+# the other scripts here import it on its own
+try:
+    from . import parallel
+except ImportError:
+    import parallel
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Moves tried first by minimax: center, corners, then edges
+MOVE_ORDER = [(1, 1), (0, 0), (0, 2), (2, 0), (2, 2),
+              (0, 1), (1, 0), (1, 2), (2, 1)]
+
+# Cell numbers, 3 * i + j, of MOVE_ORDER, and of the 8 winning lines
+MOVE_CELLS = [3 * i + j for i, j in MOVE_ORDER]
+LINES = [(0, 1, 2), (3, 4, 5), (6, 7, 8),
+         (0, 3, 6), (1, 4, 7), (2, 5, 8),
+         (0, 4, 8), (2, 4, 6)]
+
+# LINES_THROUGH[cell] holds the winning lines that contain cell
+LINES_THROUGH = [[line for line in LINES if cell in line] for cell in range(9)]
+
+# Codes stored in a Position's cells, and the marks they stand for
+CODES = {EMPTY: 0, X: 1, O: 2}
+MARKS = (EMPTY, X, O)
+UTILITIES = (0, 1, -1)
+
+# Counters from the most recent minimax call
+search_stats = {"nodes": 0}
+
+# A function that returns True once the current search is no longer
+# wanted, polled every CHECK_EVERY nodes, or None to never stop early
+cancelled = None
+CHECK_EVERY = 1024
+
+
+class Cancelled(Exception):
+    """
+    Raised inside minimax when cancelled() returns True.
+    """
+
+
+def symmetries():
+    """
+    Returns the cell indices of the board under each of its 8 rotations
+    and reflections.
+    """
+    permutations = []
+    for turns in range(4):
+        for mirrored in (False, True):
+            cells = []
+            for row in range(3):
+                for col in range(3):
+                    i, j = row, (2 - col if mirrored else col)
+                    for _ in range(turns):
+                        i, j = j, 2 - i
+                    cells.append(3 * i + j)
+            permutations.append(cells)
+    return permutations
+
+
+SYMMETRIES = symmetries()
+
+# Kinds of value stored in the transposition table
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Maps canonical board keys to (value, kind) pairs. Values do not depend
+# on search depth, so entries stay valid across minimax calls
+transposition_table = {}
+table_stats = {"probes": 0, "hits": 0, "stores": 0}
+
+
+# Perfect-play table written by perfect_play.py, loaded on first use
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "perfect_play.table")
+TABLE_MAGIC = b"TTT\x01"
+perfect_play_table = None
+
+# Starting value of the shared alpha bound in parallel_minimax, below
+# every score
+NO_BOUND = -2
+
 
 def initial_state():
     """
@@ -123,42 +204,332 @@ def utility(board):
         return 0
 
 
-def minimax(board):
+class Position():
     """
-    Returns the optimal action for the current player on the board.
+    A board that search changes in place. apply plays a cell for the
+    side to move and undo takes it back, keeping the side to move, move
+    count and empty cells up to date, so no board is ever copied. Cells
+    are numbered 3 * i + j and hold the codes in CODES.
+
+    The winner's code is kept in won. A move can only complete a line
+    through its own cell, so apply checks just those lines, and since
+    moves are only played while nobody has won, undo clears it.
     """
-    if terminal(board):
+
+    def __init__(self, board=None):
+        if board is None:
+            board = initial_state()
+        self.cells = [CODES[cell] for row in board for cell in row]
+        self.empty = {cell for cell in range(9) if not self.cells[cell]}
+        self.moves = 9 - len(self.empty)
+        self.turn = CODES[X] if self.moves % 2 == 0 else CODES[O]
+        self.won = 0
+        cells = self.cells
+        for a, b, c in LINES:
+            if cells[a] and cells[a] == cells[b] == cells[c]:
+                self.won = cells[a]
+                break
+
+    def apply(self, cell):
+        """
+        Plays cell for the side to move.
+        """
+        cells = self.cells
+        cells[cell] = self.turn
+        for a, b, c in LINES_THROUGH[cell]:
+            if cells[a] == cells[b] == cells[c]:
+                self.won = self.turn
+                break
+        self.empty.remove(cell)
+        self.moves += 1
+        self.turn = 3 - self.turn
+
+    def undo(self, cell):
+        """
+        Takes back the move just played at cell.
+        """
+        self.cells[cell] = 0
+        self.won = 0
+        self.empty.add(cell)
+        self.moves -= 1
+        self.turn = 3 - self.turn
+
+    def player(self):
+        """
+        Returns the mark of the side to move.
+        """
+        return MARKS[self.turn]
+
+    def winner(self):
+        """
+        Returns the winner of the position, if there is one.
+        """
+        return MARKS[self.won]
+
+    def terminal(self):
+        """
+        Returns True if the position is over.
+        """
+        return self.won != 0 or not self.empty
+
+    def utility(self):
+        """
+        Returns 1 if X has won, -1 if O has won, 0 otherwise.
+        """
+        return UTILITIES[self.won]
+
+    def board(self):
+        """
+        Returns the position as a list board.
+        """
+        return [[MARKS[self.cells[3 * i + j]] for j in range(3)]
+                for i in range(3)]
+
+    def key(self):
+        """
+        Returns the position's transposition table key.
+        """
+        return cells_key(self.cells)
+
+
+def board_key(board):
+    """
+    Returns a key shared by the board and all of its rotations and
+    reflections: the smallest base-3 encoding among the 8 of them.
+    """
+    return cells_key([CODES[cell] for row in board for cell in row])
+
+
+def cells_key(cells):
+    """
+    Returns board_key for a list of cell codes.
+    """
+    best = None
+    for symmetry in SYMMETRIES:
+        key = 0
+        for index in symmetry:
+            key = 3 * key + cells[index]
+        if best is None or key < best:
+            best = key
+    return best
+
+
+def probe(key, alpha, beta):
+    """
+    Returns the stored value for a position if it settles the search
+    within the (alpha, beta) window, otherwise None.
+    """
+    table_stats["probes"] += 1
+    entry = transposition_table.get(key)
+    if entry is None:
         return None
-    elif player(board) == X:
-        best_val = -math.inf
-        for action in actions(board):
-            current_val = MIN_VALUE(result(board, action))
-            if current_val > best_val:
-                best_val = current_val
-                best_action = action
+    value, kind = entry
+    if (kind == EXACT or (kind == LOWER and value >= beta)
+            or (kind == UPPER and value <= alpha)):
+        table_stats["hits"] += 1
+        return value
+    return None
+
+
+def store(key, value, alpha, beta):
+    """
+    Records a searched value, noting whether the window made it only an
+    upper or lower bound.
+    """
+    table_stats["stores"] += 1
+    if value <= alpha:
+        transposition_table[key] = (value, UPPER)
+    elif value >= beta:
+        transposition_table[key] = (value, LOWER)
     else:
-        worst_val = math.inf
-        for action in actions(board):
-            current_val = MIN_VALUE(result(board, action))
-            if current_val < worst_val:
-                worst_val = current_val
-                best_action = action
+        transposition_table[key] = (value, EXACT)
+
+
+def hit_rate():
+    """
+    Returns the fraction of transposition table probes that were hits.
+    """
+    if table_stats["probes"] == 0:
+        return 0.0
+    return table_stats["hits"] / table_stats["probes"]
+
+
+def clear_table():
+    """
+    Empties the transposition table and resets its statistics.
+    """
+    transposition_table.clear()
+    for name in table_stats:
+        table_stats[name] = 0
+
+
+def minimax(board, workers=1):
+    """
+    Returns the optimal action for the current player on the board,
+    searching the first moves across workers processes if more than one.
+    The perfect-play table answers first, so workers only matters when
+    the table has not been built.
+    """
+    search_stats["nodes"] = 0
+    if terminal(board):
+        return None
+
+    action = table_move(board)
+    if action is not None:
+        return action
+    if workers > 1:
+        return parallel_minimax(board, workers)
+
+    position = Position(board)
+    maximizing = position.player() == X
+    alpha = -math.inf
+    beta = math.inf
+    best_action = None
+    for cell in MOVE_CELLS:
+        if position.cells[cell]:
+            continue
+        position.apply(cell)
+        if maximizing:
+            current_val = MIN_VALUE(position, alpha, beta)
+            if current_val > alpha or best_action is None:
+                alpha = current_val
+                best_action = divmod(cell, 3)
+        else:
+            current_val = MAX_VALUE(position, alpha, beta)
+            if current_val < beta or best_action is None:
+                beta = current_val
+                best_action = divmod(cell, 3)
+        position.undo(cell)
     return best_action
 
 
-def MAX_VALUE(board):
+def root_score(board, cell):
+    """
+    Searches playing cell for the side to move in parallel.run's window.
+    Returns the cell, its score, 1 for a win, and the nodes searched.
+    """
+    search_stats["nodes"] = 0
+    position = Position(board)
+    maximizing = position.player() == X
+    alpha = parallel.window_alpha()
+    position.apply(cell)
+    if maximizing:
+        score = MIN_VALUE(position, alpha, math.inf)
+    else:
+        score = -MAX_VALUE(position, -math.inf, -alpha)
+    parallel.raise_alpha(score)
+    return cell, score, search_stats["nodes"]
+
+
+def parallel_minimax(board, workers):
+    """
+    Returns the optimal action, searching each first move across workers
+    processes with parallel.run. Ties go to the move earliest in
+    MOVE_ORDER, as in minimax, whatever the worker count.
+    """
+    cells = [cell for cell in MOVE_CELLS
+             if board[cell // 3][cell % 3] == EMPTY]
+    results = parallel.run(root_score, [(board, cell) for cell in cells],
+                           workers, NO_BOUND)
+    search_stats["nodes"] = sum(nodes for _, _, nodes in results)
+    return divmod(parallel.first_best(results, cells), 3)
+
+
+def load_table():
+    """
+    Returns the perfect-play table, or an empty one if it has not been
+    built with perfect_play.py.
+    """
+    global perfect_play_table
+    if perfect_play_table is None:
+        try:
+            with open(TABLE_PATH, "rb") as f:
+                data = f.read()
+        except OSError:
+            data = b""
+        if data[:len(TABLE_MAGIC)] == TABLE_MAGIC:
+            perfect_play_table = data[len(TABLE_MAGIC):]
+        else:
+            perfect_play_table = b""
+    return perfect_play_table
+
+
+def table_index(board):
+    """
+    Returns the base-3 encoding of a board used to index the table.
+    """
+    index = 0
+    for row in board:
+        for cell in row:
+            index = 3 * index + (0 if cell == EMPTY else 1 if cell == X else 2)
+    return index
+
+
+def table_move(board):
+    """
+    Returns the perfect-play table's move for a board, or None if the
+    table is missing or has no move for it.
+    """
+    table = load_table()
+    index = table_index(board)
+    if index >= len(table) or table[index] == 0xFF:
+        return None
+    return divmod(table[index] & 0xF, 3)
+
+
+def MAX_VALUE(position, alpha=-math.inf, beta=math.inf):
+    search_stats["nodes"] += 1
+    if (cancelled is not None and search_stats["nodes"] % CHECK_EVERY == 0
+            and cancelled()):
+        raise Cancelled
+    key = position.key()
+    value = probe(key, alpha, beta)
+    if value is not None:
+        return value
+    if position.terminal():
+        value = position.utility()
+        store(key, value, -math.inf, math.inf)
+        return value
+
+    window_alpha = alpha
     current_best = -math.inf
-    if terminal(board):
-        return utility(board)
-    for action in actions(board):
-        current_best = max(current_best, MIN_VALUE(result(board, action)))
+    for cell in MOVE_CELLS:
+        if position.cells[cell]:
+            continue
+        position.apply(cell)
+        current_best = max(current_best, MIN_VALUE(position, alpha, beta))
+        position.undo(cell)
+        if current_best >= beta:
+            break
+        alpha = max(alpha, current_best)
+    store(key, current_best, window_alpha, beta)
     return current_best
 
 
-def MIN_VALUE(board):
+def MIN_VALUE(position, alpha=-math.inf, beta=math.inf):
+    search_stats["nodes"] += 1
+    if (cancelled is not None and search_stats["nodes"] % CHECK_EVERY == 0
+            and cancelled()):
+        raise Cancelled
+    key = position.key()
+    value = probe(key, alpha, beta)
+    if value is not None:
+        return value
+    if position.terminal():
+        value = position.utility()
+        store(key, value, -math.inf, math.inf)
+        return value
+
+    window_beta = beta
     current_worst = math.inf
-    if terminal(board):
-        return utility(board)
-    for action in actions(board):
-        current_worst = min(current_worst, MAX_VALUE(result(board, action)))
+    for cell in MOVE_CELLS:
+        if position.cells[cell]:
+            continue
+        position.apply(cell)
+        current_worst = min(current_worst, MAX_VALUE(position, alpha, beta))
+        position.undo(cell)
+        if current_worst <= alpha:
+            break
+        beta = min(beta, current_worst)
+    store(key, current_worst, alpha, window_beta)
     return current_worst